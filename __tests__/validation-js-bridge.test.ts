@@ -8,9 +8,12 @@ import {
   ValidationEngine,
   IdeaGenerator,
   ValidationData,
+  DEFAULT_SCORING_RULES,
+  roundHalfEven,
   benchmarkFunction,
   runBenchmarks
 } from '../lib/validation-js-bridge';
+import scoringRules from '../lib/scoring-rules.json';
 
 describe('ValidationEngine', () => {
   const validator = new ValidationEngine();
@@ -92,6 +95,52 @@ describe('ValidationEngine', () => {
   });
 });
 
+describe('Scoring rules', () => {
+  it('should default to the shared rule fixture', () => {
+    expect(DEFAULT_SCORING_RULES).toEqual(scoringRules);
+    expect(DEFAULT_SCORING_RULES.market.keywords).toContain('texas');
+  });
+
+  it('should score from the rules it is given', () => {
+    const rules = {
+      ...DEFAULT_SCORING_RULES,
+      budget: { ...DEFAULT_SCORING_RULES.budget, weight: 50 }
+    };
+    const validator = new ValidationEngine(rules);
+
+    const result = validator.calculateFeasibility({ estimatedBudget: '$10' });
+
+    expect(result.score).toBe(50);
+  });
+
+  it('should round half to even like Python', () => {
+    expect(roundHalfEven(22.5)).toBe(22);
+    expect(roundHalfEven(27.5)).toBe(28);
+    expect(roundHalfEven(22.6)).toBe(23);
+
+    // 75% completeness = 22.5 points, which Python rounds to 22
+    const result = new ValidationEngine().calculateFeasibility({
+      businessName: 'Test',
+      businessType: 'Tech',
+      businessGoals: 'Goals'
+    });
+    expect(result.score).toBe(22);
+  });
+
+  it('should base the recommendation on the unrounded score', () => {
+    // 22.5 + 25 + 20 + 12 = 79.5: rounds to 80 but stays Moderate, as in Python
+    const result = new ValidationEngine().calculateFeasibility({
+      businessType: 'Tech',
+      businessGoals: 'Serve the local community and every customer in Texas. '.repeat(3),
+      accommodationNeeds: 'a'.repeat(101),
+      targetMarket: 'x'.repeat(51),
+      estimatedBudget: '$5'
+    });
+    expect(result.score).toBe(80);
+    expect(result.recommendation).toBe('Moderate feasibility');
+  });
+});
+
 describe('IdeaGenerator', () => {
   const generator = new IdeaGenerator();
 
@@ -3,6 +3,7 @@ Comprehensive benchmarking suite for Local AI Service
 Measures performance, accuracy, and scalability metrics
 """
 
+import itertools
 import time
 import statistics
 import sys
@@ -115,6 +116,94 @@ def benchmark_idea_generation():
     return results
 
 
+def benchmark_template_rendering():
+    """Benchmark compiled templates against the previous per-call f-string rendering"""
+    print("\n📊 Benchmarking Template Rendering...")
+    
+    import random
+    import tracemalloc
+    
+    generator = IdeaGenerator()
+    
+    # Baselines: the previous generate_idea built all four category strings
+    # on every call, and enhancement split the whole prompt on '"'
+    def legacy_generate_idea(category):
+        templates = generator.category_templates.get(category, [])
+        if not templates:
+            return "Category not found"
+        template = random.choice(templates)
+        location = random.choice(generator.texas_keywords)
+        ideas = {
+            "jobs": f"AI-optimized position in {template} focusing on {location} market opportunities with emphasis on innovation and growth",
+            "businesses": f"Launch a {template} in {location} leveraging Texas market advantages and sustainable business practices",
+            "self-employment": f"Build a {template} business serving the {location} area with focus on flexible, scalable operations",
+            "contracts": f"Secure {template} opportunities in {location} region supporting public infrastructure and community development",
+        }
+        return ideas.get(category, "Generate innovative Texas-focused opportunity")
+    
+    def legacy_enhance(prompt):
+        base_idea = prompt.split('"')[1] if '"' in prompt else ''
+        return f"{base_idea}\n\nTexas Market Advantages:\n- Strong economic growth\n- Business-friendly regulations\n- Access to diverse markets\n\nEstimated Startup: $25,000-$75,000\nTarget Demographics: Texas professionals and entrepreneurs"
+    
+    # Shaped like the frontend's enhanceIdeaWithAI prompt
+    prompt = (
+        'You are a business consultant specializing in Texas opportunities.\n\n'
+        'Based on this business idea: "Launch a technology startup in Austin"\n\n'
+        'Category: businesses\n\n'
+        + 'Please enhance this idea with "Texas" market advantages and "startup" requirements.\n' * 20
+    )
+    
+    def measure(func, iterations=200000):
+        """Mean latency and peak transient heap bytes per call"""
+        start = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        elapsed = time.perf_counter() - start
+        
+        tracemalloc.start()
+        peaks = []
+        for _ in range(200):
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            func()
+            peaks.append(tracemalloc.get_traced_memory()[1] - before)
+        tracemalloc.stop()
+        return {
+            'mean_us': elapsed / iterations * 1e6,
+            'calls_per_sec': iterations / elapsed,
+            'peak_alloc_bytes': statistics.median(peaks)
+        }
+    
+    results = {}
+    cases = [
+        ('Idea - Legacy', lambda: legacy_generate_idea('contracts')),
+        ('Idea - Compiled', lambda: generator.generate_idea('contracts')),
+        ('Enhance - Legacy', lambda: legacy_enhance(prompt)),
+        ('Enhance - Compiled', lambda: generator.enhance(prompt)),
+    ]
+    for label, func in cases:
+        print(f"  Testing {label.lower()}...")
+        results[f'Template Rendering - {label}'] = measure(func)
+    
+    print("  Testing a set of 5000 templates...")
+    templates = {
+        f'{category}-{i}': f'Variant {i}: {source}'
+        for i in range(1250)
+        for category, source in local_ai_service.IDEA_TEMPLATES.items()
+    }
+    start = time.perf_counter()
+    template_set = local_ai_service.TemplateSet(templates, local_ai_service.IDEA_TEMPLATE_SLOTS)
+    load_ms = (time.perf_counter() - start) * 1000
+    names = list(templates)
+    metrics = measure(lambda: template_set.get(random.choice(names)).render(focus='retail innovation', location='Austin'))
+    metrics['templates'] = len(template_set)
+    metrics['load_ms'] = load_ms
+    metrics['load_us_per_template'] = load_ms * 1000 / len(template_set)
+    results['Template Rendering - 5000 Template Set'] = metrics
+    
+    return results
+
+
 def benchmark_validation():
     """Benchmark validation engine performance"""
     print("\n📊 Benchmarking Validation Engine...")
@@ -157,6 +246,557 @@ def benchmark_validation():
     return results
 
 
+def benchmark_large_payloads():
+    """Benchmark validation latency on ~1 MB request payloads"""
+    print("\n📊 Benchmarking Large Payloads...")
+    
+    validator = ValidationEngine()
+    client = app.test_client()
+    
+    half_mb = 512 * 1024
+    data = {
+        'businessName': 'Texas Tech Solutions',
+        'businessType': 'Technology',
+        'businessGoals': 'Serve the local community. ' * (half_mb // 27),
+        'accommodationNeeds': 'Accessible workspace. ' * (half_mb // 22),
+        'targetMarket': 'Texas customers',
+        'estimatedBudget': '$75,000'
+    }
+    body = json.dumps(data)
+    
+    results = {}
+    
+    # Baseline: the previous implementation concatenated and lowercased the
+    # market fields on every call before looking for keywords
+    print("  Testing baseline market scan (concat + lower)...")
+    keywords = local_ai_service.SCORING_RULES['market']['keywords']
+    
+    def baseline_market_scan():
+        market_text = f"{data['targetMarket']} {data['businessGoals']}".lower()
+        return sum(1 for kw in keywords if kw in market_text)
+    
+    metrics = benchmark_function(baseline_market_scan, iterations=50)
+    results['Large Payload - Baseline Market Scan'] = metrics
+    
+    print("  Testing calculate_feasibility on 1 MB payload...")
+    metrics = benchmark_function(
+        lambda: validator.calculate_feasibility(data),
+        iterations=50
+    )
+    results['Large Payload - Feasibility'] = metrics
+    
+    print("  Testing /api/validate on 1 MB payload...")
+    metrics = benchmark_function(
+        lambda: client.post('/api/validate', data=body, content_type='application/json'),
+        iterations=50
+    )
+    metrics['payload_bytes'] = len(body)
+    results['Large Payload - Validate Endpoint'] = metrics
+    
+    print("  Testing rejection of oversized payload...")
+    oversized = 'x' * (local_ai_service.MAX_REQUEST_BYTES + 1)
+    metrics = benchmark_function(
+        lambda: client.post('/api/validate', data=oversized, content_type='application/json'),
+        iterations=50
+    )
+    results['Large Payload - Oversized Rejection'] = metrics
+    
+    return results
+
+
+def benchmark_admission_control():
+    """Benchmark /api/generate latency and shedding under a request burst"""
+    print("\n📊 Benchmarking Admission Control...")
+    
+    import threading
+    
+    burst_size = 32
+    payload = json.dumps({'prompt': 'Generate a business idea', 'category': 'businesses'})
+    
+    original = local_ai_service.admission['generate']
+    local_ai_service.admission['generate'] = local_ai_service.AdmissionController(
+        'generate', max_concurrent=4, max_queue=4, queue_timeout=1.0
+    )
+    
+    latencies = {200: [], 503: []}
+    lock = threading.Lock()
+    
+    def send():
+        client = app.test_client()
+        start = time.perf_counter()
+        response = client.post('/api/generate', data=payload, content_type='application/json')
+        elapsed = (time.perf_counter() - start) * 1000
+        with lock:
+            latencies.setdefault(response.status_code, []).append(elapsed)
+    
+    results = {}
+    try:
+        print(f"  Sending burst of {burst_size} generate requests...")
+        threads = [threading.Thread(target=send) for _ in range(burst_size)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        
+        # Health checks bypass admission control and stay fast under load
+        health = benchmark_function(lambda: app.test_client().get('/api/health'), iterations=20)
+        
+        for thread in threads:
+            thread.join()
+        total_ms = (time.perf_counter() - start) * 1000
+        
+        admitted = sorted(latencies[200])
+        shed = sorted(latencies[503])
+        stats = local_ai_service.admission['generate'].stats()
+        results['Admission Control - Generate Burst'] = {
+            'burst_size': burst_size,
+            'total_time_ms': total_ms,
+            'admitted': len(admitted),
+            'shed': stats['shed'] + stats['timed_out'],
+            'admitted_p50_ms': statistics.median(admitted) if admitted else 0.0,
+            'admitted_max_ms': admitted[-1] if admitted else 0.0,
+            'shed_p50_ms': statistics.median(shed) if shed else 0.0,
+            'health_mean_ms_under_load': health['mean_ms']
+        }
+    finally:
+        local_ai_service.admission['generate'] = original
+    
+    return results
+
+
+def benchmark_validation_batching():
+    """Compare /api/validate throughput with and without micro-batching"""
+    print("\n📊 Benchmarking Validation Micro-Batching...")
+    
+    import threading
+    
+    workers = 16
+    requests_per_worker = 100
+    payload = json.dumps({
+        'businessName': 'Texas Tech Solutions',
+        'businessType': 'Technology',
+        'businessGoals': 'Create innovative software for the local community',
+        'accommodationNeeds': 'Accessible workspace',
+        'targetMarket': 'Texas small businesses',
+        'estimatedBudget': '$75,000'
+    })
+    
+    def run_load():
+        def worker():
+            client = app.test_client()
+            for _ in range(requests_per_worker):
+                client.post('/api/validate', data=payload, content_type='application/json')
+        
+        threads = [threading.Thread(target=worker) for _ in range(workers)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return time.perf_counter() - start
+    
+    results = {}
+    original = local_ai_service.VALIDATE_BATCHING
+    try:
+        for mode, enabled in (('Direct', False), ('Batched', True)):
+            print(f"  Testing mode: {mode}...")
+            local_ai_service.VALIDATE_BATCHING = enabled
+            before = local_ai_service.validation_batcher.stats()
+            elapsed = run_load()
+            after = local_ai_service.validation_batcher.stats()
+            total = workers * requests_per_worker
+            batches = after['batches'] - before['batches']
+            results[f'Validation Batching - {mode}'] = {
+                'requests': total,
+                'workers': workers,
+                'total_time_ms': elapsed * 1000,
+                'throughput_per_sec': total / elapsed,
+                'batches': batches,
+                'avg_batch_size': (after['items'] - before['items']) / batches if batches else 0.0
+            }
+    finally:
+        local_ai_service.VALIDATE_BATCHING = original
+    
+    # The scoring itself: a batch shares one keyword scan across its items
+    engine = ValidationEngine()
+    items = [json.loads(payload) for _ in range(local_ai_service.VALIDATE_BATCH_MAX_SIZE)]
+    iterations = 500
+    for mode, score in (
+        ('Per-item Scoring', lambda: [engine.calculate_feasibility(data) for data in items]),
+        ('Batch Scoring', lambda: engine.calculate_feasibility_batch(items)),
+    ):
+        print(f"  Testing {mode.lower()} of {len(items)} submissions...")
+        start = time.perf_counter()
+        for _ in range(iterations):
+            score()
+        elapsed = time.perf_counter() - start
+        results[f'Validation Batching - {mode}'] = {
+            'batch_size': len(items),
+            'per_item_us': elapsed / (iterations * len(items)) * 1e6,
+            'throughput_per_sec': iterations * len(items) / elapsed
+        }
+    
+    return results
+
+
+def benchmark_top_k_pipeline():
+    """Benchmark the generate-and-rank pipeline and its memory footprint"""
+    print("\n📊 Benchmarking Top-K Pipeline...")
+    
+    import tracemalloc
+    
+    profile = {'businessName': 'Texas Tech Solutions', 'estimatedBudget': '$75,000'}
+    results = {}
+    
+    for max_candidates in (1000, 10000):
+        # Disable early termination so every candidate is generated and scored
+        ranker = local_ai_service.IdeaRanker(IdeaGenerator(), ValidationEngine(), patience=max_candidates)
+        print(f"  Testing exhaustive ranking of {max_candidates} candidates...")
+        
+        tracemalloc.start()
+        start = time.perf_counter()
+        result = ranker.top_k('businesses', 10, max_candidates, profile)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        
+        results[f'Top-K Pipeline - Exhaustive {max_candidates}'] = {
+            'explored': result['explored'],
+            'total_time_ms': elapsed * 1000,
+            'throughput_per_sec': result['explored'] / elapsed,
+            'peak_memory_kb': peak / 1024
+        }
+    
+    print("  Testing ranking with early termination...")
+    ranker = local_ai_service.IdeaRanker(IdeaGenerator(), ValidationEngine())
+    metrics = benchmark_function(
+        lambda: ranker.top_k('businesses', 10, 10000, profile),
+        iterations=20
+    )
+    metrics['explored'] = ranker.top_k('businesses', 10, 10000, profile)['explored']
+    results['Top-K Pipeline - Early Termination'] = metrics
+    
+    return results
+
+
+def benchmark_near_duplicate_index():
+    """Benchmark near-duplicate lookups against a large MinHash/LSH index"""
+    print("\n📊 Benchmarking Near-Duplicate Index...")
+    
+    import random
+    
+    size = int(os.environ.get('LSH_BENCHMARK_SIZE', 1_000_000))
+    rng = random.Random(42)
+    vocabulary = [f"word{i}" for i in range(5000)]
+    index = local_ai_service.NearDuplicateIndex(capacity=size)
+    results = {}
+    
+    # Filling with random signatures keeps setup time down; lookups still
+    # hash the query text and probe the full set of LSH buckets
+    print(f"  Filling index with {size} signatures...")
+    start = time.perf_counter()
+    for _ in range(size - 1000):
+        index.add_signature(rng.randbytes(index.num_perm * 4))
+    texts = [' '.join(rng.choices(vocabulary, k=16)) for _ in range(1000)]
+    for text in texts:
+        index.add(text)
+    build_ms = (time.perf_counter() - start) * 1000
+    
+    print("  Testing signature computation...")
+    results['Near-Duplicate Index - Signature'] = benchmark_function(
+        lambda: index.signature(texts[0]),
+        iterations=1000
+    )
+    
+    print("  Testing near-duplicate lookups (hits)...")
+    edited = itertools.cycle([text + ' today' for text in texts])
+    metrics = benchmark_function(lambda: index.query(next(edited)), iterations=1000)
+    metrics['hit_rate'] = sum(index.query(text + ' today') is not None for text in texts) / len(texts)
+    metrics['indexed'] = len(index)
+    metrics['build_time_ms'] = build_ms
+    results['Near-Duplicate Index - Lookup Hit'] = metrics
+    
+    print("  Testing lookups of unseen ideas (misses)...")
+    unseen = [' '.join(rng.choices(vocabulary, k=16)) for _ in range(1000)]
+    fresh = itertools.cycle(unseen)
+    metrics = benchmark_function(lambda: index.query(next(fresh)), iterations=1000)
+    metrics['false_positive_rate'] = sum(index.query(text) is not None for text in unseen) / len(unseen)
+    results['Near-Duplicate Index - Lookup Miss'] = metrics
+    
+    return results
+
+
+def benchmark_job_queue():
+    """Benchmark job submission and processing throughput under sustained load"""
+    print("\n📊 Benchmarking Job Queue...")
+    
+    import tempfile
+    
+    jobs = 200
+    items_per_job = 50
+    items = [{
+        'businessName': 'Texas Tech Solutions',
+        'businessType': 'Technology',
+        'businessGoals': 'Create innovative software for the local community',
+        'targetMarket': 'Texas small businesses',
+        'estimatedBudget': '$75,000'
+    }] * items_per_job
+    
+    results = {}
+    with tempfile.TemporaryDirectory() as tmpdir:
+        queue = local_ai_service.JobQueue(
+            os.path.join(tmpdir, 'jobs.db'), IdeaGenerator(), ValidationEngine(),
+            poll_interval=0.01
+        )
+        try:
+            print(f"  Submitting {jobs} validation jobs of {items_per_job} items...")
+            start = time.perf_counter()
+            submit_times = []
+            job_ids = []
+            for _ in range(jobs):
+                submitted = time.perf_counter()
+                job_ids.append(queue.submit('validate', {'items': items})['id'])
+                submit_times.append((time.perf_counter() - submitted) * 1000)
+            submit_elapsed = time.perf_counter() - start
+            
+            print("  Waiting for workers to drain the queue...")
+            while any(queue.get(job_id)['status'] not in queue.FINISHED for job_id in job_ids):
+                time.sleep(0.01)
+            total_elapsed = time.perf_counter() - start
+            
+            results['Job Queue - Sustained Validation'] = {
+                'jobs': jobs,
+                'items': jobs * items_per_job,
+                'submit_mean_ms': statistics.mean(submit_times),
+                'submit_per_sec': jobs / submit_elapsed,
+                'total_time_ms': total_elapsed * 1000,
+                'jobs_per_sec': jobs / total_elapsed,
+                'items_per_sec': jobs * items_per_job / total_elapsed
+            }
+        finally:
+            queue.stop(timeout=10)
+    
+    return results
+
+
+def benchmark_response_compression():
+    """Benchmark bytes on the wire and CPU cost of each Content-Encoding by response size"""
+    print("\n📊 Benchmarking Response Compression...")
+    
+    generator = IdeaGenerator()
+    validator = ValidationEngine()
+    rows = []
+    for category in itertools.islice(itertools.cycle(generator.category_templates), 20000):
+        idea = generator.generate_idea(category)
+        feasibility = validator.calculate_feasibility({
+            'businessName': 'Texas Tech Solutions',
+            'businessType': 'Technology',
+            'businessGoals': idea,
+            'targetMarket': 'Texas small businesses',
+            'estimatedBudget': '$75,000'
+        })
+        rows.append({'text': idea, **feasibility})
+    
+    results = {}
+    for label, count in (('Small (10 results)', 10), ('Page (1000 results)', 1000),
+                         ('NDJSON (20000 results)', 20000)):
+        if label.startswith('NDJSON'):
+            # Chunked the way /api/jobs/<id>/results streams: one page per chunk
+            page = local_ai_service.JOB_RESULTS_MAX_LIMIT
+            chunks = [
+                ''.join(json.dumps(row) + '\n' for row in rows[i:i + page]).encode()
+                for i in range(0, count, page)
+            ]
+        else:
+            chunks = [json.dumps({'results': rows[:count]}).encode()]
+        identity_bytes = sum(len(chunk) for chunk in chunks)
+        iterations = max(3, 2000 // count)
+        
+        metrics = {'identity_bytes': identity_bytes}
+        for encoding in local_ai_service.available_encodings():
+            print(f"  {label} with {encoding}...")
+            times = []
+            for _ in range(iterations):
+                start = time.perf_counter()
+                if len(chunks) == 1:
+                    compressor = local_ai_service.Compressor(encoding)
+                    wire = len(compressor.compress(chunks[0]) + compressor.finish())
+                else:
+                    wire = sum(len(part) for part in local_ai_service.compress_stream(
+                        iter(chunks), local_ai_service.Compressor(encoding)))
+                times.append((time.perf_counter() - start) * 1000)
+            metrics[f'{encoding}_bytes'] = wire
+            metrics[f'{encoding}_ratio'] = identity_bytes / wire
+            metrics[f'{encoding}_mean_ms'] = statistics.mean(times)
+            metrics[f'{encoding}_mb_per_sec'] = identity_bytes / 1e6 / (statistics.mean(times) / 1000)
+        results[f'Response Compression - {label}'] = metrics
+    
+    return results
+
+
+def _start_stub_model_server(delay_fn):
+    """Start a local Ollama-like server whose reply delay comes from delay_fn()"""
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+        
+        def do_POST(self):
+            self.rfile.read(int(self.headers['Content-Length']))
+            self.server.hits += 1
+            time.sleep(delay_fn())
+            body = b'{"response": "stub idea"}'
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+    
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    server.hits = 0
+    threading.Thread(target=server.serve_forever, args=(0.01,), daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_address[1]}'
+
+
+def benchmark_model_routing():
+    """Benchmark tail latency across stub model servers with and without hedging"""
+    print("\n📊 Benchmarking Model Routing...")
+    
+    import random
+    
+    rng = random.Random(7)
+    
+    # Each server usually answers in 5 ms but stalls for 250 ms 3% of the time
+    def delay():
+        return 0.25 if rng.random() < 0.03 else 0.005
+    
+    servers = [_start_stub_model_server(delay) for _ in range(3)]
+    urls = [url for _, url in servers]
+    results = {}
+    
+    try:
+        for mode, hedge_delay in (('No Hedging', None), ('Hedged', 0.05)):
+            print(f"  Testing mode: {mode}...")
+            router = local_ai_service.ModelRouter(urls, hedge_delay=hedge_delay)
+            latencies = []
+            for _ in range(300):
+                start = time.perf_counter()
+                router.request('POST', '/api/generate', json={'prompt': 'x'}, timeout=5)
+                latencies.append((time.perf_counter() - start) * 1000)
+            
+            latencies.sort()
+            stats = router.stats()
+            results[f'Model Routing - {mode}'] = {
+                'requests': len(latencies),
+                'p50_ms': latencies[len(latencies) // 2],
+                'p95_ms': latencies[int(len(latencies) * 0.95) - 1],
+                'p99_ms': latencies[int(len(latencies) * 0.99) - 1],
+                'max_ms': latencies[-1],
+                'hedged': stats['hedged'],
+                'hedge_wins': stats['hedge_wins']
+            }
+    finally:
+        for server, _ in servers:
+            server.shutdown()
+            server.server_close()
+    
+    # Concurrent callers: least-outstanding routing should spread the load
+    print("  Testing concurrent load balancing...")
+    from concurrent.futures import ThreadPoolExecutor
+    
+    servers = [_start_stub_model_server(lambda: 0.05) for _ in range(2)]
+    try:
+        router = local_ai_service.ModelRouter([url for _, url in servers], hedge_delay=None)
+        
+        def timed_request(_):
+            start = time.perf_counter()
+            router.request('POST', '/api/generate', json={'prompt': 'x'}, timeout=5)
+            return (time.perf_counter() - start) * 1000
+        
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            latencies = sorted(pool.map(timed_request, range(320)))
+        hits = [server.hits for server, _ in servers]
+        results['Model Routing - Concurrent (16 callers, 2 servers)'] = {
+            'requests': len(latencies),
+            'p50_ms': latencies[len(latencies) // 2],
+            'p99_ms': latencies[int(len(latencies) * 0.99) - 1],
+            'server_a_requests': hits[0],
+            'server_b_requests': hits[1],
+            'balance_ratio': min(hits) / max(hits)
+        }
+    finally:
+        for server, _ in servers:
+            server.shutdown()
+            server.server_close()
+    
+    return results
+
+
+def benchmark_tracing_overhead():
+    """Benchmark /api/validate latency with tracing off and at several sample rates"""
+    print("\n📊 Benchmarking Tracing Overhead...")
+    
+    import tempfile
+    from unittest.mock import patch
+    
+    client = app.test_client()
+    body = json.dumps({
+        'businessName': 'Texas Tech Solutions',
+        'businessType': 'Technology',
+        'businessGoals': 'Create innovative software for the local community',
+        'targetMarket': 'Texas small businesses',
+        'estimatedBudget': '$75,000'
+    })
+    
+    def validate():
+        client.post('/api/validate', data=body, content_type='application/json')
+    
+    results = {}
+    with tempfile.TemporaryDirectory() as tmpdir:
+        configs = [('Disabled', None)] + [
+            (f'Sample Rate {rate:g}', rate) for rate in (0.0, 0.01, 0.1, 1.0)
+        ]
+        for label, rate in configs:
+            print(f"  Testing tracing {label.lower()}...")
+            if rate is None:
+                tracer = local_ai_service.Tracer()
+            else:
+                exporter = local_ai_service.SpanExporter(os.path.join(tmpdir, 'traces.jsonl'))
+                tracer = local_ai_service.Tracer(exporter, rate)
+            with patch.object(local_ai_service, 'tracer', tracer):
+                for _ in range(100):
+                    validate()
+                metrics = benchmark_function(validate, iterations=2000)
+            if tracer.exporter is not None:
+                tracer.exporter.shutdown()
+                metrics.update(tracer.exporter.stats())
+            results[f'Tracing - {label}'] = metrics
+        
+        print("  Testing span export throughput...")
+        exporter = local_ai_service.SpanExporter(os.path.join(tmpdir, 'export.jsonl'), interval=60)
+        tracer = local_ai_service.Tracer(exporter, 1.0)
+        spans = 50000
+        start = time.perf_counter()
+        for _ in range(spans // 5000):
+            for _ in range(5000):
+                root = tracer.start_request('GET /api/health')
+                root.set_attribute('http.status_code', 200)
+                root.end()
+            exporter.flush()
+        elapsed = time.perf_counter() - start
+        results['Tracing - Span Export'] = {
+            'spans': spans,
+            'spans_per_sec': spans / elapsed,
+            'us_per_span': elapsed / spans * 1e6,
+            'file_bytes': os.path.getsize(os.path.join(tmpdir, 'export.jsonl'))
+        }
+        exporter.shutdown()
+    
+    return results
+
+
 def benchmark_api_endpoints():
     """Benchmark API endpoints"""
     print("\n📊 Benchmarking API Endpoints...")
@@ -282,11 +922,61 @@ def run_all_benchmarks():
         for name, metrics in results.items():
             benchmark_results.add_result(name, metrics)
         
+        # Template rendering benchmarks
+        results = benchmark_template_rendering()
+        for name, metrics in results.items():
+            benchmark_results.add_result(name, metrics)
+        
         # Validation benchmarks
         results = benchmark_validation()
         for name, metrics in results.items():
             benchmark_results.add_result(name, metrics)
         
+        # Large payload benchmarks
+        results = benchmark_large_payloads()
+        for name, metrics in results.items():
+            benchmark_results.add_result(name, metrics)
+        
+        # Admission control benchmarks
+        results = benchmark_admission_control()
+        for name, metrics in results.items():
+            benchmark_results.add_result(name, metrics)
+        
+        # Validation micro-batching benchmarks
+        results = benchmark_validation_batching()
+        for name, metrics in results.items():
+            benchmark_results.add_result(name, metrics)
+        
+        # Generate-and-rank pipeline benchmarks
+        results = benchmark_top_k_pipeline()
+        for name, metrics in results.items():
+            benchmark_results.add_result(name, metrics)
+        
+        # Near-duplicate index benchmarks
+        results = benchmark_near_duplicate_index()
+        for name, metrics in results.items():
+            benchmark_results.add_result(name, metrics)
+        
+        # Job queue benchmarks
+        results = benchmark_job_queue()
+        for name, metrics in results.items():
+            benchmark_results.add_result(name, metrics)
+        
+        # Model routing benchmarks
+        results = benchmark_model_routing()
+        for name, metrics in results.items():
+            benchmark_results.add_result(name, metrics)
+        
+        # Response compression benchmarks
+        results = benchmark_response_compression()
+        for name, metrics in results.items():
+            benchmark_results.add_result(name, metrics)
+        
+        # Tracing overhead benchmarks
+        results = benchmark_tracing_overhead()
+        for name, metrics in results.items():
+            benchmark_results.add_result(name, metrics)
+        
         # API endpoint benchmarks
         results = benchmark_api_endpoints()
         for name, metrics in results.items():
@@ -4,12 +4,49 @@ Provides AI-powered idea generation and validation using local models
 Compatible with Ollama and other local AI solutions
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, g, request, jsonify
 from flask_cors import CORS
+import requests
+from requests.adapters import HTTPAdapter
+from werkzeug.exceptions import (
+    BadRequest, HTTPException, NotFound, RequestEntityTooLarge, UnsupportedMediaType
+)
+import ast
+import atexit
+import bisect
+import contextvars
+import functools
+import hashlib
+import heapq
+import itertools
+import keyword
+import operator
+import re
+import socket
+import sqlite3
+import string
+import uuid
+import zlib
+from array import array
+from collections import OrderedDict, deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+import json
+import threading
 import time
 import random
 import os
-from typing import Dict, Any, List
+from typing import Callable, Dict, Any, Iterator, List, Optional, Tuple
+
+# Optional compressors; Accept-Encoding negotiation offers them when installed
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for frontend communication
@@ -18,11 +55,294 @@ CORS(app)  # Enable CORS for frontend communication
 AI_MODEL = "local-ai-model"
 PORT = 5000
 
+# Request body limits (bytes); oversized bodies are rejected with 413
+MAX_REQUEST_BYTES = int(os.environ.get('MAX_REQUEST_BYTES', 2 * 1024 * 1024))
+REQUEST_READ_CHUNK_BYTES = 64 * 1024
+app.config['MAX_CONTENT_LENGTH'] = MAX_REQUEST_BYTES
+
+# Admission control: concurrent requests and waiting queue per endpoint.
+# Requests beyond max_concurrent + max_queue are shed with 503.
+ADMISSION_LIMITS = {
+    'generate': {
+        'max_concurrent': int(os.environ.get('GENERATE_MAX_CONCURRENT', 8)),
+        'max_queue': int(os.environ.get('GENERATE_MAX_QUEUE', 16)),
+    },
+    'validate': {
+        'max_concurrent': int(os.environ.get('VALIDATE_MAX_CONCURRENT', 32)),
+        'max_queue': int(os.environ.get('VALIDATE_MAX_QUEUE', 64)),
+    },
+    'ollama_status': {
+        'max_concurrent': int(os.environ.get('OLLAMA_STATUS_MAX_CONCURRENT', 2)),
+        'max_queue': int(os.environ.get('OLLAMA_STATUS_MAX_QUEUE', 4)),
+    },
+    'generate_top': {
+        'max_concurrent': int(os.environ.get('GENERATE_TOP_MAX_CONCURRENT', 4)),
+        'max_queue': int(os.environ.get('GENERATE_TOP_MAX_QUEUE', 8)),
+    },
+}
+ADMISSION_QUEUE_TIMEOUT = float(os.environ.get('ADMISSION_QUEUE_TIMEOUT', 1.0))
+
+# Micro-batching for /api/validate: requests arriving within the window are
+# scored together in one pass (off by default)
+VALIDATE_BATCHING = os.environ.get('VALIDATE_BATCHING', '').lower() in ('1', 'true', 'yes')
+VALIDATE_BATCH_WINDOW_MS = float(os.environ.get('VALIDATE_BATCH_WINDOW_MS', 0.5))
+VALIDATE_BATCH_MAX_SIZE = int(os.environ.get('VALIDATE_BATCH_MAX_SIZE', 64))
+
+# Feasibility scoring rules, served at /api/scoring-rules so clients can score
+# locally with the same spec. Bump the version whenever a rule changes.
+# Recommendation thresholds compare against the unrounded score; the final
+# score is capped at max_score and rounded half-to-even. The frontend's
+# built-in copy is lib/scoring-rules.json; keep it identical.
+SCORING_RULES = {
+    'version': 1,
+    'max_score': 100,
+    'completeness': {
+        'weight': 30,
+        'label': 'Completeness',
+        'fields': ['businessName', 'businessType', 'businessGoals', 'accommodationNeeds'],
+    },
+    'detail': {
+        'weight': 25,
+        'label': 'Detail Level',
+        'thresholds': [
+            {'field': 'accommodationNeeds', 'longer_than': 100, 'points': 0.4},
+            {'field': 'businessGoals', 'longer_than': 100, 'points': 0.4},
+            {'field': 'targetMarket', 'longer_than': 50, 'points': 0.2},
+        ],
+    },
+    'budget': {
+        'weight': 20,
+        'field': 'estimatedBudget',
+        'met_label': 'Budget: Well-defined',
+        'unmet_label': 'Budget: Needs specification',
+    },
+    'market': {
+        'weight': 15,
+        'label': 'Market Alignment',
+        'fields': ['targetMarket', 'businessGoals'],
+        'keywords': ['texas', 'local', 'community', 'market', 'customer'],
+    },
+    'readiness': [
+        {'field': 'timeline', 'points': 5},
+        {'field': 'expectedOutcomes', 'points': 5},
+    ],
+    'recommendations': [
+        {'min_score': 80, 'label': 'High feasibility'},
+        {'min_score': 60, 'label': 'Moderate feasibility'},
+    ],
+    'default_recommendation': 'Needs refinement',
+}
+SCORING_RULES_MAX_AGE = int(os.environ.get('SCORING_RULES_MAX_AGE', 300))
+
+# Idea and enhancement text templates, compiled once when IdeaGenerator is
+# created. Slots are written {name}; literal braces as {{ and }}.
+IDEA_TEMPLATE_SLOTS = ('focus', 'location')
+IDEA_TEMPLATES = {
+    "jobs": "AI-optimized position in {focus} focusing on {location} market opportunities with emphasis on innovation and growth",
+    "businesses": "Launch a {focus} in {location} leveraging Texas market advantages and sustainable business practices",
+    "self-employment": "Build a {focus} business serving the {location} area with focus on flexible, scalable operations",
+    "contracts": "Secure {focus} opportunities in {location} region supporting public infrastructure and community development",
+}
+ENHANCEMENT_TEMPLATE = (
+    "{idea}\n\n"
+    "Texas Market Advantages:\n"
+    "- Strong economic growth\n"
+    "- Business-friendly regulations\n"
+    "- Access to diverse markets\n\n"
+    "Estimated Startup: $25,000-$75,000\n"
+    "Target Demographics: Texas professionals and entrepreneurs"
+)
+
+# Generate-and-rank pipeline limits for /api/generate/top
+RANK_MAX_K = 50
+RANK_MAX_CANDIDATES = int(os.environ.get('RANK_MAX_CANDIDATES', 10000))
+RANK_BATCH_SIZE = 64
+RANK_PATIENCE = 4
+
+# Near-duplicate filtering of served ideas, per session (X-Session-ID header
+# or session_id field). Ideas whose estimated Jaccard similarity to one
+# already served reaches DEDUP_THRESHOLD are treated as duplicates. Distinct
+# templated ideas of one category (same template, different focus or
+# location) share up to ~0.71 of their 3-grams, so the threshold sits above that.
+DEDUP_THRESHOLD = float(os.environ.get('DEDUP_THRESHOLD', 0.8))
+DEDUP_INDEX_CAPACITY = int(os.environ.get('DEDUP_INDEX_CAPACITY', 1000))
+DEDUP_MAX_SESSIONS = int(os.environ.get('DEDUP_MAX_SESSIONS', 256))
+# Session IDs come from clients, so the total across sessions is capped too.
+# An indexed idea costs up to ~2 KB, so the default bounds the indexes at
+# ~40 MB per worker process.
+DEDUP_MAX_INDEXED = int(os.environ.get('DEDUP_MAX_INDEXED', 20000))
+DEDUP_MAX_ATTEMPTS = 5
+MINHASH_PERMUTATIONS = 64
+LSH_BANDS = 16
+
+# Background jobs: durable SQLite-backed queue for bulk generation/validation
+JOB_DB_PATH = os.environ.get(
+    'JOB_DB_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'jobs.db')
+)
+JOB_WORKERS = int(os.environ.get('JOB_WORKERS', 2))
+JOB_WRITE_BATCH = int(os.environ.get('JOB_WRITE_BATCH', 256))
+JOB_POLL_INTERVAL = float(os.environ.get('JOB_POLL_INTERVAL', 1.0))
+JOB_MAX_ITEMS = int(os.environ.get('JOB_MAX_ITEMS', 100000))
+JOB_RESULTS_MAX_LIMIT = 1000
+# A running job whose owner has not committed a batch for this long is
+# presumed dead and may be claimed by any queue sharing the database
+JOB_LEASE_SECONDS = float(os.environ.get('JOB_LEASE_SECONDS', 60))
+JOB_MAX_BACKOFF = 5.0
+
+# Local model servers (Ollama-compatible). Requests go to the endpoint with the
+# fewest in flight; a duplicate is sent to the next one if the first has not
+# answered within its p95 latency. Endpoints failing the status probe (or
+# OLLAMA_EJECT_FAILURES requests in a row) are skipped for OLLAMA_EJECT_SECONDS.
+OLLAMA_ENDPOINTS = [
+    url.strip().rstrip('/')
+    for url in os.environ.get('OLLAMA_ENDPOINTS', 'http://localhost:11434').split(',')
+    if url.strip()
+]
+OLLAMA_POOL_SIZE = int(os.environ.get('OLLAMA_POOL_SIZE', 10))
+OLLAMA_TIMEOUT = float(os.environ.get('OLLAMA_TIMEOUT', 60))
+OLLAMA_PROBE_TIMEOUT = float(os.environ.get('OLLAMA_PROBE_TIMEOUT', 2))
+OLLAMA_HEDGE_DELAY = float(os.environ.get('OLLAMA_HEDGE_DELAY', 1.0))
+OLLAMA_HEDGE_MIN_SAMPLES = 20
+OLLAMA_EJECT_SECONDS = float(os.environ.get('OLLAMA_EJECT_SECONDS', 30))
+OLLAMA_EJECT_FAILURES = 3
+
+# Response compression (Accept-Encoding)
+COMPRESS_MIN_BYTES = int(os.environ.get('COMPRESS_MIN_BYTES', 1024))
+COMPRESS_LEVEL = int(os.environ.get('COMPRESS_LEVEL', 6))
+COMPRESSIBLE_MIMETYPES = ('application/json', 'application/x-ndjson', 'text/')
+
+# Request tracing. Spans are exported as OTLP/JSON, in batches, to
+# TRACE_EXPORT_PATH (one ExportTraceServiceRequest per line) and/or an OTLP/HTTP
+# collector at TRACE_OTLP_ENDPOINT; tracing is off when neither is set. A request
+# whose incoming traceparent is sampled is always traced, others with
+# probability TRACE_SAMPLE_RATE.
+TRACE_EXPORT_PATH = os.environ.get('TRACE_EXPORT_PATH', '')
+TRACE_OTLP_ENDPOINT = os.environ.get('TRACE_OTLP_ENDPOINT', '').rstrip('/')
+TRACE_SAMPLE_RATE = float(os.environ.get('TRACE_SAMPLE_RATE', 0.01))
+TRACE_BATCH_SIZE = int(os.environ.get('TRACE_BATCH_SIZE', 512))
+TRACE_EXPORT_INTERVAL = float(os.environ.get('TRACE_EXPORT_INTERVAL', 2.0))
+TRACE_MAX_QUEUE = int(os.environ.get('TRACE_MAX_QUEUE', 8192))
+TRACE_SERVICE_NAME = 'local-ai-service'
+
+
+class TemplateError(ValueError):
+    """A template failed validation when it was loaded"""
+
+
+def check_slot_names(slots: Tuple[str, ...]):
+    """Raise TemplateError unless every slot name is a usable identifier"""
+    for slot in slots:
+        if not isinstance(slot, str) or not slot.isidentifier() or keyword.iskeyword(slot):
+            raise TemplateError(f"Invalid slot name: {slot!r}")
+
+
+class CompiledTemplate:
+    """
+    A text template compiled once into a render function
+    
+    The template is checked against the allowed slot names when it is loaded
+    and compiled into a single f-string expression, so render(**values)
+    builds the result in one allocation without re-parsing the template.
+    Slots the template does not use may be omitted.
+    """
+    
+    def __init__(self, name: str, source: str, slots: Tuple[str, ...]):
+        check_slot_names(slots)
+        self.name = name
+        self.source = source
+        self.slots = tuple(slots)
+        self.used_slots, self.render = self._compile()
+    
+    def _compile(self) -> Tuple[Tuple[str, ...], Callable[..., str]]:
+        try:
+            parsed = list(string.Formatter().parse(self.source))
+        except ValueError as e:
+            raise TemplateError(f"Template {self.name!r}: {e}")
+        
+        parts = []
+        used = []
+        for literal, field, format_spec, conversion in parsed:
+            if literal:
+                parts.append(ast.Constant(literal))
+            if field is None:
+                continue
+            if field not in self.slots:
+                raise TemplateError(
+                    f"Template {self.name!r} uses unknown slot {{{field}}}; "
+                    f"allowed slots: {', '.join(self.slots)}"
+                )
+            if format_spec or conversion:
+                raise TemplateError(
+                    f"Template {self.name!r}: slot {{{field}}} may not have a format spec or conversion"
+                )
+            parts.append(ast.FormattedValue(ast.Name(field, ast.Load()), -1, None))
+            if field not in used:
+                used.append(field)
+        
+        # Every slot is keyword-only; unused ones default to None
+        arguments = ast.arguments(
+            posonlyargs=[], args=[], vararg=None,
+            kwonlyargs=[ast.arg(slot) for slot in self.slots],
+            kw_defaults=[None if slot in used else ast.Constant(None) for slot in self.slots],
+            kwarg=None, defaults=[]
+        )
+        body = ast.JoinedStr(parts) if parts else ast.Constant('')
+        tree = ast.fix_missing_locations(ast.Expression(ast.Lambda(arguments, body)))
+        render = eval(compile(tree, f'<template {self.name}>', 'eval'), {'__builtins__': {}})
+        return tuple(used), render
+    
+    def __repr__(self) -> str:
+        return f"CompiledTemplate({self.name!r}, slots={self.used_slots})"
+
+
+class TemplateSet:
+    """
+    Named templates sharing one set of slot names, all compiled at load
+    
+    Every template is validated up front and all failures are reported
+    together. Templates with identical source share one render function.
+    """
+    
+    def __init__(self, templates: Dict[str, str], slots: Tuple[str, ...]):
+        check_slot_names(slots)
+        self.slots = tuple(slots)
+        self._templates = {}
+        
+        compiled = {}
+        errors = []
+        for name, source in templates.items():
+            if not isinstance(source, str):
+                errors.append(f"Template {name!r} must be a string")
+                continue
+            try:
+                template = compiled.get(source)
+                if template is None:
+                    template = compiled[source] = CompiledTemplate(name, source, self.slots)
+            except TemplateError as e:
+                errors.append(str(e))
+                continue
+            self._templates[name] = template
+        if errors:
+            raise TemplateError("; ".join(errors))
+    
+    def get(self, name: str) -> Optional[CompiledTemplate]:
+        return self._templates.get(name)
+    
+    def render(self, name: str, **values) -> str:
+        return self._templates[name].render(**values)
+    
+    def __contains__(self, name: str) -> bool:
+        return name in self._templates
+    
+    def __len__(self) -> int:
+        return len(self._templates)
+
 
 class IdeaGenerator:
     """Enhanced idea generator with AI-like capabilities"""
     
-    def __init__(self):
+    def __init__(self, idea_templates: Dict[str, str] = None,
+                 enhancement_template: str = ENHANCEMENT_TEMPLATE):
         self.texas_keywords = [
             "Texas", "Lone Star", "Dallas", "Houston", "Austin", 
             "San Antonio", "border", "Gulf Coast", "Permian Basin"
@@ -58,166 +378,1886 @@ class IdeaGenerator:
                 "community services",
             ],
         }
+        
+        self.idea_templates = TemplateSet(
+            IDEA_TEMPLATES if idea_templates is None else idea_templates, IDEA_TEMPLATE_SLOTS
+        )
+        self.enhancement_template = CompiledTemplate('enhancement', enhancement_template, ('idea',))
     
     def generate_idea(self, category: str, context: Dict[str, Any] = None) -> str:
         """Generate an AI-enhanced business idea"""
-        templates = self.category_templates.get(category, [])
-        if not templates:
+        focuses = self.category_templates.get(category, [])
+        if not focuses:
             return "Category not found"
         
-        template = random.choice(templates)
+        focus = random.choice(focuses)
         location = random.choice(self.texas_keywords)
         
-        # Simulate AI-enhanced generation
-        ideas = {
-            "jobs": f"AI-optimized position in {template} focusing on {location} market opportunities with emphasis on innovation and growth",
-            "businesses": f"Launch a {template} in {location} leveraging Texas market advantages and sustainable business practices",
-            "self-employment": f"Build a {template} business serving the {location} area with focus on flexible, scalable operations",
-            "contracts": f"Secure {template} opportunities in {location} region supporting public infrastructure and community development",
-        }
+        template = self.idea_templates.get(category)
+        if template is None:
+            return "Generate innovative Texas-focused opportunity"
+        return template.render(focus=focus, location=location)
+    
+    def iter_ideas(self, category: str, context: Dict[str, Any] = None) -> Iterator[str]:
+        """Lazily yield an endless stream of ideas for a category"""
+        focuses = self.category_templates.get(category, [])
+        template = self.idea_templates.get(category)
+        if not focuses or template is None:
+            while True:
+                yield self.generate_idea(category, context)
         
-        return ideas.get(category, "Generate innovative Texas-focused opportunity")
+        render, choice, locations = template.render, random.choice, self.texas_keywords
+        while True:
+            yield render(focus=choice(focuses), location=choice(locations))
+    
+    def enhance(self, prompt: str) -> str:
+        """Expand the first double-quoted idea in prompt with Texas market notes"""
+        start = prompt.find('"')
+        if start < 0:
+            idea = ''
+        else:
+            end = prompt.find('"', start + 1)
+            idea = prompt[start + 1:] if end < 0 else prompt[start + 1:end]
+        return self.enhancement_template.render(idea=idea)
 
 
 class ValidationEngine:
-    """Advanced validation and feasibility assessment"""
+    """Advanced validation and feasibility assessment driven by a scoring-rule spec"""
+    
+    # Large fields are lowercased one window at a time instead of all at once
+    SCAN_WINDOW_CHARS = 64 * 1024
+    
+    def __init__(self, rules: Dict[str, Any] = None):
+        self.rules = SCORING_RULES if rules is None else rules
+        self._compile(self.rules)
+        self.rules_json = json.dumps(self.rules, sort_keys=True, separators=(',', ':'))
+        self.rules_etag = hashlib.sha256(self.rules_json.encode('utf-8')).hexdigest()[:32]
+    
+    def _compile(self, rules: Dict[str, Any]):
+        """Flatten the rule spec into tuples so scoring does no dict lookups"""
+        try:
+            completeness = rules['completeness']
+            detail = rules['detail']
+            budget = rules['budget']
+            market = rules['market']
+            
+            self.version = rules['version']
+            self._max_score = rules['max_score']
+            self._required_fields = tuple(completeness['fields'])
+            self._completeness = (completeness['weight'], completeness['label'])
+            self._detail_thresholds = tuple(
+                (t['field'], t['longer_than'], t['points']) for t in detail['thresholds']
+            )
+            self._detail = (detail['weight'], detail['label'])
+            self._budget = (budget['field'], budget['weight'], budget['met_label'], budget['unmet_label'])
+            self._market_fields = tuple(market['fields'])
+            self._market_keywords = tuple(market['keywords'])
+            self._market = (market['weight'], market['label'])
+            self._readiness = tuple((r['field'], r['points']) for r in rules['readiness'])
+            self._recommendations = tuple(
+                (r['min_score'], r['label']) for r in rules['recommendations']
+            )
+            self._default_recommendation = rules['default_recommendation']
+        except (KeyError, TypeError) as e:
+            raise ValueError(f"Invalid scoring rules: {e!r}")
+        
+        if not self._required_fields or not self._market_keywords or not all(self._market_keywords):
+            raise ValueError("Invalid scoring rules: completeness fields and market keywords must not be empty")
     
     @staticmethod
-    def calculate_feasibility(data: Dict[str, Any]) -> Dict[str, Any]:
+    def find_keywords(texts: List[str], keywords: List[str]) -> set:
+        """
+        Return the keywords that occur (case-insensitively) in any of texts
+        
+        Each text is lowercased in bounded, overlapping windows so memory stays
+        flat for large fields, and scanning stops once every keyword is found.
+        """
+        remaining = set(keywords)
+        overlap = max(len(kw) for kw in keywords) - 1
+        window = ValidationEngine.SCAN_WINDOW_CHARS
+        for text in texts:
+            for start in range(0, len(text), window):
+                chunk = text[max(start - overlap, 0):start + window].lower()
+                remaining.difference_update([kw for kw in remaining if kw in chunk])
+                if not remaining:
+                    return set(keywords)
+        return set(keywords) - remaining
+    
+    def calculate_feasibility(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Calculate feasibility score using multiple factors"""
+        market_fields = [data.get(field, '') for field in self._market_fields]
+        return self._score(data, len(ValidationEngine.find_keywords(market_fields, self._market_keywords)))
+    
+    def _score(self, data: Dict[str, Any], market_matches: int) -> Dict[str, Any]:
+        """Score a submission given how many market keywords it mentions"""
         score = 0
         factors = []
         
-        # Completeness factor (30%)
-        required_fields = ['businessName', 'businessType', 'businessGoals', 'accommodationNeeds']
+        # Completeness factor
+        weight, label = self._completeness
+        required_fields = self._required_fields
         completeness = sum(1 for field in required_fields if data.get(field)) / len(required_fields)
-        score += completeness * 30
-        factors.append(f"Completeness: {completeness * 100:.0f}%")
+        score += completeness * weight
+        factors.append(f"{label}: {completeness * 100:.0f}%")
         
-        # Detail factor (25%)
+        # Detail factor
+        weight, label = self._detail
         detail_score = 0
-        if len(data.get('accommodationNeeds', '')) > 100:
-            detail_score += 0.4
-        if len(data.get('businessGoals', '')) > 100:
-            detail_score += 0.4
-        if len(data.get('targetMarket', '')) > 50:
-            detail_score += 0.2
-        score += detail_score * 25
-        factors.append(f"Detail Level: {detail_score * 100:.0f}%")
-        
-        # Budget factor (20%)
-        budget_str = data.get('estimatedBudget', '')
+        for field, longer_than, points in self._detail_thresholds:
+            if len(data.get(field, '')) > longer_than:
+                detail_score += points
+        score += detail_score * weight
+        factors.append(f"{label}: {detail_score * 100:.0f}%")
+        
+        # Budget factor
+        field, weight, met_label, unmet_label = self._budget
+        budget_str = data.get(field, '')
         if any(char.isdigit() for char in budget_str):
-            score += 20
-            factors.append("Budget: Well-defined")
+            score += weight
+            factors.append(met_label)
         else:
-            factors.append("Budget: Needs specification")
-        
-        # Market alignment (15%)
-        market_keywords = ['texas', 'local', 'community', 'market', 'customer']
-        market_text = f"{data.get('targetMarket', '')} {data.get('businessGoals', '')}".lower()
-        market_matches = sum(1 for kw in market_keywords if kw in market_text)
-        market_score = min(market_matches / len(market_keywords), 1.0)
-        score += market_score * 15
-        factors.append(f"Market Alignment: {market_score * 100:.0f}%")
-        
-        # Implementation readiness (10%)
-        if data.get('timeline'):
-            score += 5
-        if data.get('expectedOutcomes'):
-            score += 5
+            factors.append(unmet_label)
+        
+        # Market alignment
+        weight, label = self._market
+        market_score = min(market_matches / len(self._market_keywords), 1.0)
+        score += market_score * weight
+        factors.append(f"{label}: {market_score * 100:.0f}%")
+        
+        # Implementation readiness
+        for field, points in self._readiness:
+            if data.get(field):
+                score += points
+        
+        recommendation = self._default_recommendation
+        for min_score, label in self._recommendations:
+            if score >= min_score:
+                recommendation = label
+                break
         
         return {
-            'score': round(min(score, 100)),
+            'score': round(min(score, self._max_score)),
             'factors': factors,
-            'recommendation': 'High feasibility' if score >= 80 else 'Moderate feasibility' if score >= 60 else 'Needs refinement'
+            'recommendation': recommendation
+        }
+    
+    def calculate_feasibility_batch(self, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Calculate feasibility for many submissions in a single pass"""
+        score = self._score
+        return [score(data, matches) for data, matches in zip(items, self._market_matches_batch(items))]
+    
+    def _market_matches_batch(self, items: List[Dict[str, Any]]) -> List[int]:
+        """
+        Count the market keywords each submission mentions, scanning the batch at once
+        
+        The batch's market text is lowercased and joined into one string, so
+        each keyword costs a few str.find calls for the whole batch instead of
+        a scan per submission; a hit is attributed to its submission by
+        bisecting the start offsets, and the search resumes at the next one.
+        NUL separators keep keywords from matching across fields. Submissions
+        too large for one window are scanned alone with find_keywords.
+        """
+        market_fields = self._market_fields
+        keywords = self._market_keywords
+        window = ValidationEngine.SCAN_WINDOW_CHARS
+        texts = []
+        starts = []
+        large = []
+        position = 0
+        for i, data in enumerate(items):
+            text = '\0'.join([data.get(field, '') for field in market_fields])
+            if len(text) > window:
+                large.append(i)
+                text = ''
+            text = text.lower()
+            starts.append(position)
+            texts.append(text)
+            position += len(text) + 1
+        
+        text = '\0'.join(texts)
+        counts = [0] * len(items)
+        last = len(items) - 1
+        for keyword in keywords:
+            position = text.find(keyword)
+            while position != -1:
+                i = bisect.bisect_right(starts, position) - 1
+                counts[i] += 1
+                if i == last:
+                    break
+                position = text.find(keyword, starts[i + 1])
+        
+        for i in large:
+            market_text = [items[i].get(field, '') for field in market_fields]
+            counts[i] = len(ValidationEngine.find_keywords(market_text, keywords))
+        return counts
+
+
+class AdmissionController:
+    """Concurrency limiter with a bounded wait queue for one endpoint"""
+    
+    def __init__(self, name: str, max_concurrent: int, max_queue: int,
+                 queue_timeout: float = ADMISSION_QUEUE_TIMEOUT):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self.queued = 0
+        self.admitted = 0
+        self.shed = 0
+        self.timed_out = 0
+        self._cond = threading.Condition()
+    
+    def acquire(self) -> bool:
+        """
+        Take a slot, waiting in the queue if every slot is busy
+        
+        Returns False without blocking when the queue is already full, or
+        after queue_timeout seconds if no slot frees up in time.
+        """
+        with self._cond:
+            if self.active < self.max_concurrent and self.queued == 0:
+                self.active += 1
+                self.admitted += 1
+                return True
+            
+            if self.queued >= self.max_queue:
+                self.shed += 1
+                return False
+            
+            self.queued += 1
+            deadline = time.monotonic() + self.queue_timeout
+            try:
+                while self.active >= self.max_concurrent:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.timed_out += 1
+                        return False
+                    self._cond.wait(remaining)
+            finally:
+                self.queued -= 1
+            
+            self.active += 1
+            self.admitted += 1
+            return True
+    
+    def release(self):
+        """Return a slot and wake one queued request"""
+        with self._cond:
+            self.active -= 1
+            self._cond.notify()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of current load and lifetime counters"""
+        with self._cond:
+            return {
+                'active': self.active,
+                'queued': self.queued,
+                'max_concurrent': self.max_concurrent,
+                'max_queue': self.max_queue,
+                'admitted': self.admitted,
+                'shed': self.shed,
+                'timed_out': self.timed_out,
+            }
+
+
+class ValidationBatcher:
+    """
+    Collects concurrent validation requests and scores them in batches
+    
+    The first request to arrive opens a window of window_ms; everything
+    submitted before it closes (up to max_batch_size) is scored in one
+    calculate_feasibility_batch call on a background thread, and each caller
+    receives its own result through a Future.
+    """
+    
+    def __init__(self, engine: ValidationEngine, window_ms: float = VALIDATE_BATCH_WINDOW_MS,
+                 max_batch_size: int = VALIDATE_BATCH_MAX_SIZE):
+        self.engine = engine
+        self.window = window_ms / 1000
+        self.max_batch_size = max_batch_size
+        self.batches = 0
+        self.items = 0
+        self._pending = []
+        self._cond = threading.Condition()
+        self._thread = None
+    
+    def submit(self, data: Dict[str, Any]) -> Future:
+        """Queue a submission for the next batch"""
+        future = Future()
+        with self._cond:
+            self._pending.append((data, future))
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name='validation-batcher', daemon=True
+                )
+                self._thread.start()
+            self._cond.notify()
+        return future
+    
+    def _next_batch(self) -> list:
+        with self._cond:
+            while not self._pending:
+                self._cond.wait()
+            deadline = time.monotonic() + self.window
+            while len(self._pending) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            batch = self._pending[:self.max_batch_size]
+            del self._pending[:self.max_batch_size]
+            return batch
+    
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            self.batches += 1
+            self.items += len(batch)
+            try:
+                results = self.engine.calculate_feasibility_batch([data for data, _ in batch])
+            except Exception:
+                # Score one at a time so a bad submission only fails its own request
+                for data, future in batch:
+                    try:
+                        future.set_result(self.engine.calculate_feasibility(data))
+                    except Exception as e:
+                        future.set_exception(e)
+                continue
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Batch counters since startup"""
+        return {
+            'batches': self.batches,
+            'items': self.items,
+            'avg_batch_size': self.items / self.batches if self.batches else 0.0,
+        }
+
+
+class IdeaRanker:
+    """
+    Generate-and-rank pipeline that keeps the K most feasible ideas
+    
+    Candidates are pulled from IdeaGenerator.iter_ideas in batches, scored with
+    ValidationEngine.calculate_feasibility_batch, and offered to a size-K
+    min-heap, so memory stays O(K + batch_size) however many are explored.
+    Exploration stops early once `patience` consecutive batches fail to
+    place a single candidate in the top K.
+    """
+    
+    def __init__(self, generator: IdeaGenerator, engine: ValidationEngine,
+                 batch_size: int = RANK_BATCH_SIZE, patience: int = RANK_PATIENCE):
+        self.generator = generator
+        self.engine = engine
+        self.batch_size = batch_size
+        self.patience = patience
+    
+    def top_k(self, category: str, k: int, max_candidates: int,
+              profile: Dict[str, Any] = None, context: Dict[str, Any] = None,
+              exclude: Callable[[str], bool] = None) -> Dict[str, Any]:
+        """
+        Return the k highest-scoring unique ideas for a category
+        
+        Each idea is scored as the businessGoals of a submission built from
+        profile (the user's other form fields) with businessType set to the
+        category. Ideas for which exclude(text) is true are skipped.
+        """
+        base = dict(profile or {})
+        base['businessType'] = category
+        
+        # Entries are (score, -sequence, text, result): the root is the weakest
+        # kept idea, and on equal scores the earlier candidate wins
+        heap = []
+        kept = set()
+        explored = 0
+        stale_batches = 0
+        sequence = itertools.count()
+        stream = self.generator.iter_ideas(category, context)
+        
+        while explored < max_candidates and stale_batches < self.patience:
+            batch = list(itertools.islice(stream, min(self.batch_size, max_candidates - explored)))
+            explored += len(batch)
+            submissions = [dict(base, businessGoals=text) for text in batch]
+            results = self.engine.calculate_feasibility_batch(submissions)
+            
+            improved = False
+            for text, result in zip(batch, results):
+                if text in kept:
+                    continue
+                entry = (result['score'], -next(sequence), text, result)
+                full = len(heap) >= k
+                if full and entry[:2] <= heap[0][:2]:
+                    continue
+                # Only candidates that would enter the top K pay for the check
+                if exclude is not None and exclude(text):
+                    continue
+                if full:
+                    kept.discard(heapq.heapreplace(heap, entry)[2])
+                else:
+                    heapq.heappush(heap, entry)
+                kept.add(text)
+                improved = True
+            
+            stale_batches = 0 if improved else stale_batches + 1
+        
+        ranked = sorted(heap, key=lambda entry: entry[:2], reverse=True)
+        return {
+            'ideas': [
+                {
+                    'text': text,
+                    'score': result['score'],
+                    'factors': result['factors'],
+                    'recommendation': result['recommendation'],
+                }
+                for _, _, text, result in ranked
+            ],
+            'explored': explored,
+            'stopped_early': explored < max_candidates,
+        }
+
+
+class NearDuplicateIndex:
+    """
+    MinHash / LSH index for spotting near-duplicate idea text
+    
+    Each text is reduced to a MinHash signature over its word 3-grams and
+    bucketed by LSH band, so a lookup only compares against the handful of
+    ideas sharing a band instead of scanning the whole index. Each bucket
+    remembers the most recent idea that hashed into it, and the oldest idea
+    is evicted once `capacity` are indexed, so memory is bounded.
+    """
+    
+    def __init__(self, threshold: float = DEDUP_THRESHOLD, capacity: int = DEDUP_INDEX_CAPACITY,
+                 num_perm: int = MINHASH_PERMUTATIONS, bands: int = LSH_BANDS):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.threshold = threshold
+        self.capacity = capacity
+        self.num_perm = num_perm
+        self.bands = bands
+        self.evicted = 0
+        self._band_bytes = num_perm // bands * 4
+        self._buckets = [{} for _ in range(bands)]
+        self._items = OrderedDict()
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+    
+    def __len__(self) -> int:
+        return len(self._items)
+    
+    def signature(self, text: str) -> bytes:
+        """MinHash signature: per-lane minimum of each shingle's 32-bit hashes"""
+        words = text.lower().split()
+        shingles = [' '.join(words[i:i + 3]) for i in range(max(len(words) - 2, 1))]
+        digest_size = self.num_perm * 4
+        rows = [
+            array('I', hashlib.shake_128(shingle.encode('utf-8')).digest(digest_size))
+            for shingle in shingles
+        ]
+        return array('I', map(min, zip(*rows))).tobytes()
+    
+    def _band_keys(self, signature: bytes) -> List[int]:
+        size = self._band_bytes
+        return [hash(signature[i:i + size]) for i in range(0, len(signature), size)]
+    
+    def similarity(self, a: bytes, b: bytes) -> float:
+        """Estimated Jaccard similarity: fraction of matching signature lanes"""
+        lanes_a = memoryview(a).cast('I')
+        lanes_b = memoryview(b).cast('I')
+        return sum(map(operator.eq, lanes_a, lanes_b)) / self.num_perm
+    
+    def query_signature(self, signature: bytes) -> Optional[Tuple[int, float]]:
+        """Return (id, similarity) of the closest indexed idea at or above threshold"""
+        best = None
+        checked = set()
+        with self._lock:
+            for bucket, key in zip(self._buckets, self._band_keys(signature)):
+                item_id = bucket.get(key)
+                if item_id is None or item_id in checked:
+                    continue
+                checked.add(item_id)
+                score = self.similarity(signature, self._items[item_id])
+                if score >= self.threshold and (best is None or score > best[1]):
+                    best = (item_id, score)
+        return best
+    
+    def add_signature(self, signature: bytes) -> int:
+        """Index a signature, evicting the oldest entry when full"""
+        with self._lock:
+            item_id = next(self._ids)
+            self._items[item_id] = signature
+            for bucket, key in zip(self._buckets, self._band_keys(signature)):
+                bucket[key] = item_id
+            while len(self._items) > self.capacity:
+                self._evict_oldest()
+        return item_id
+    
+    def _evict_oldest(self):
+        item_id, signature = self._items.popitem(last=False)
+        for bucket, key in zip(self._buckets, self._band_keys(signature)):
+            if bucket.get(key) == item_id:
+                del bucket[key]
+        self.evicted += 1
+    
+    def query(self, text: str) -> Optional[Tuple[int, float]]:
+        """Look up the closest near-duplicate of text, if any"""
+        return self.query_signature(self.signature(text))
+    
+    def add(self, text: str) -> int:
+        """Index text and return its id"""
+        return self.add_signature(self.signature(text))
+    
+    def check_and_add(self, text: str) -> Optional[Tuple[int, float]]:
+        """Return the near-duplicate match for text, or index it if there is none"""
+        signature = self.signature(text)
+        match = self.query_signature(signature)
+        if match is None:
+            self.add_signature(signature)
+        return match
+    
+    def stats(self) -> Dict[str, Any]:
+        """Index size and eviction counters"""
+        return {
+            'indexed': len(self._items),
+            'capacity': self.capacity,
+            'evicted': self.evicted,
+        }
+
+
+class SessionIndexes:
+    """
+    Near-duplicate indexes per session, least recently used session evicted
+    
+    Sessions are dropped once there are more than `max_sessions`, or once
+    they hold more than `max_indexed` ideas between them. The total is
+    checked on each lookup, so it can overshoot only by what requests in
+    flight add.
+    """
+    
+    def __init__(self, max_sessions: int = DEDUP_MAX_SESSIONS, max_indexed: int = DEDUP_MAX_INDEXED,
+                 **index_options):
+        self.max_sessions = max_sessions
+        self.max_indexed = max_indexed
+        self.index_options = index_options
+        self.evicted = 0
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, session_id: str) -> NearDuplicateIndex:
+        """Return the index for a session, creating it on first use"""
+        with self._lock:
+            index = self._sessions.get(session_id)
+            if index is None:
+                index = self._sessions[session_id] = NearDuplicateIndex(**self.index_options)
+            else:
+                self._sessions.move_to_end(session_id)
+            indexed = sum(len(other) for other in self._sessions.values())
+            # Never evict the session being returned
+            while len(self._sessions) > 1 and (
+                len(self._sessions) > self.max_sessions or indexed > self.max_indexed
+            ):
+                _, evicted = self._sessions.popitem(last=False)
+                indexed -= len(evicted)
+                self.evicted += 1
+            return index
+    
+    def stats(self) -> Dict[str, Any]:
+        """Session count, total indexed ideas and sessions evicted"""
+        with self._lock:
+            return {
+                'sessions': len(self._sessions),
+                'indexed': sum(len(index) for index in self._sessions.values()),
+                'max_indexed': self.max_indexed,
+                'evicted': self.evicted,
+            }
+
+
+class JobQueue:
+    """
+    Durable background job queue backed by SQLite in WAL mode
+    
+    Jobs are rows in `jobs`; a pool of worker threads claims queued jobs and
+    writes results to `job_results` in batches of write_batch, committing the
+    results and the job's progress counter in the same transaction. Several
+    processes may share one database: a claim records the queue's owner ID,
+    and every committed batch renews the claim's lease (`updated_at`). A
+    running job whose lease has expired, such as one left behind by a crashed
+    or restarted process, is claimed again and resumes after its last
+    committed batch. Cancelling a job stops it at the next batch.
+    """
+    
+    KINDS = ('generate', 'validate')
+    FINISHED = ('completed', 'failed', 'cancelled')
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS jobs (
+            id TEXT PRIMARY KEY,
+            kind TEXT NOT NULL,
+            params TEXT NOT NULL,
+            status TEXT NOT NULL,
+            total INTEGER NOT NULL,
+            completed INTEGER NOT NULL DEFAULT 0,
+            error TEXT,
+            owner TEXT,
+            created_at REAL NOT NULL,
+            updated_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS jobs_by_status ON jobs (status, created_at);
+        CREATE TABLE IF NOT EXISTS job_results (
+            job_id TEXT NOT NULL,
+            seq INTEGER NOT NULL,
+            result TEXT NOT NULL,
+            PRIMARY KEY (job_id, seq)
+        ) WITHOUT ROWID;
+    """
+    
+    def __init__(self, path: str, generator: IdeaGenerator, engine: ValidationEngine,
+                 workers: int = JOB_WORKERS, write_batch: int = JOB_WRITE_BATCH,
+                 poll_interval: float = JOB_POLL_INTERVAL, lease_seconds: float = JOB_LEASE_SECONDS):
+        self.path = path
+        self.generator = generator
+        self.engine = engine
+        self.write_batch = write_batch
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.owner = f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}'
+        self._local = threading.local()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        
+        conn = self._connect()
+        conn.executescript(self.SCHEMA)
+        # Stores created before claims had owners
+        columns = {row['name'] for row in conn.execute("PRAGMA table_info(jobs)")}
+        if 'owner' not in columns:
+            conn.execute("ALTER TABLE jobs ADD COLUMN owner TEXT")
+        
+        self._threads = [
+            threading.Thread(target=self._work, name=f'job-worker-{i}', daemon=True)
+            for i in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Per-thread connection in autocommit mode; transactions are explicit"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+    
+    @staticmethod
+    def _job_dict(row: sqlite3.Row) -> Dict[str, Any]:
+        return {
+            'id': row['id'],
+            'kind': row['kind'],
+            'status': row['status'],
+            'total': row['total'],
+            'completed': row['completed'],
+            'error': row['error'],
+            'created_at': row['created_at'],
+            'updated_at': row['updated_at'],
+        }
+    
+    def submit(self, kind: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Queue a job and return its initial status
+        
+        Raises:
+            ValueError: unknown kind or invalid params
+        """
+        if kind == 'generate':
+            total = params.get('count')
+            if params.get('category') not in self.generator.category_templates:
+                raise ValueError(f"Unknown category: {params.get('category')}")
+            if not isinstance(total, int) or not 1 <= total <= JOB_MAX_ITEMS:
+                raise ValueError(f"count must be an integer between 1 and {JOB_MAX_ITEMS}")
+        elif kind == 'validate':
+            items = params.get('items')
+            if not isinstance(items, list) or not all(isinstance(item, dict) for item in items):
+                raise ValueError("items must be a list of objects")
+            total = len(items)
+            if not 1 <= total <= JOB_MAX_ITEMS:
+                raise ValueError(f"items must contain between 1 and {JOB_MAX_ITEMS} entries")
+        else:
+            raise ValueError(f"kind must be one of {', '.join(self.KINDS)}")
+        
+        now = time.time()
+        job_id = uuid.uuid4().hex
+        self._connect().execute(
+            "INSERT INTO jobs (id, kind, params, status, total, created_at, updated_at) "
+            "VALUES (?, ?, ?, 'queued', ?, ?, ?)",
+            (job_id, kind, json.dumps(params), total, now, now)
+        )
+        self._wakeup.set()
+        return self.get(job_id)
+    
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Current status of a job, or None if it does not exist"""
+        row = self._connect().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return None if row is None else self._job_dict(row)
+    
+    def results(self, job_id: str, offset: int, limit: int) -> List[Dict[str, Any]]:
+        """One page of committed results, in submission order"""
+        rows = self._connect().execute(
+            "SELECT result FROM job_results WHERE job_id = ? AND seq >= ? ORDER BY seq LIMIT ?",
+            (job_id, offset, limit)
+        ).fetchall()
+        return [json.loads(row['result']) for row in rows]
+    
+    def iter_result_pages(self, job_id: str, offset: int = 0,
+                          page_size: int = JOB_RESULTS_MAX_LIMIT) -> Iterator[List[Dict[str, Any]]]:
+        """Yield committed results from offset onwards, one page per query"""
+        while True:
+            page = self.results(job_id, offset, page_size)
+            if page:
+                yield page
+            if len(page) < page_size:
+                return
+            offset += len(page)
+    
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a queued or running job; False if it already finished"""
+        cursor = self._connect().execute(
+            "UPDATE jobs SET status = 'cancelled', updated_at = ? "
+            "WHERE id = ? AND status IN ('queued', 'running')",
+            (time.time(), job_id)
+        )
+        return cursor.rowcount == 1
+    
+    def stop(self, timeout: float = None):
+        """Stop the workers after their current batch"""
+        self._stopping.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout)
+    
+    def _claim(self) -> Optional[sqlite3.Row]:
+        """Take the oldest queued job, or a running one whose lease has expired"""
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            now = time.time()
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE status = 'queued' "
+                "OR (status = 'running' AND updated_at < ?) ORDER BY created_at LIMIT 1",
+                (now - self.lease_seconds,)
+            ).fetchone()
+            if row is not None:
+                conn.execute(
+                    "UPDATE jobs SET status = 'running', owner = ?, updated_at = ? WHERE id = ?",
+                    (self.owner, now, row['id'])
+                )
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        return row
+    
+    def _work(self):
+        failures = 0
+        while not self._stopping.is_set():
+            try:
+                job = self._claim()
+                if job is None:
+                    self._wakeup.wait(self.poll_interval)
+                    self._wakeup.clear()
+                else:
+                    try:
+                        self._run(job)
+                    except Exception as e:
+                        app.logger.exception("Job %s failed", job['id'])
+                        self._connect().execute(
+                            "UPDATE jobs SET status = 'failed', error = ?, updated_at = ? "
+                            "WHERE id = ? AND status = 'running' AND owner = ?",
+                            (str(e), time.time(), job['id'], self.owner)
+                        )
+                failures = 0
+            except Exception:
+                # Database errors (e.g. "database is locked") must not kill the
+                # worker; back off and try again
+                failures += 1
+                app.logger.exception("Job worker error; retrying")
+                self._stopping.wait(min(self.poll_interval * 2 ** failures, JOB_MAX_BACKOFF))
+    
+    def _batches(self, job: sqlite3.Row) -> Iterator[List[Dict[str, Any]]]:
+        """Yield result batches starting after the job's committed progress"""
+        params = json.loads(job['params'])
+        start, total = job['completed'], job['total']
+        
+        if job['kind'] == 'generate':
+            stream = self.generator.iter_ideas(params['category'], params.get('context'))
+            for offset in range(start, total, self.write_batch):
+                count = min(self.write_batch, total - offset)
+                yield [{'text': text} for text in itertools.islice(stream, count)]
+        else:
+            items = params['items']
+            for offset in range(start, total, self.write_batch):
+                batch = items[offset:offset + self.write_batch]
+                try:
+                    yield self.engine.calculate_feasibility_batch(batch)
+                except Exception:
+                    yield [self._validate_one(data) for data in batch]
+    
+    def _validate_one(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            return self.engine.calculate_feasibility(data)
+        except Exception as e:
+            return {'error': str(e)}
+    
+    def _run(self, job: sqlite3.Row):
+        conn = self._connect()
+        seq = job['completed']
+        for batch in self._batches(job):
+            if self._stopping.is_set():
+                return
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                # Renews the lease; fails if the job was cancelled or its
+                # expired lease was claimed by another queue
+                cursor = conn.execute(
+                    "UPDATE jobs SET completed = completed + ?, updated_at = ? "
+                    "WHERE id = ? AND status = 'running' AND owner = ?",
+                    (len(batch), time.time(), job['id'], self.owner)
+                )
+                if cursor.rowcount == 0:
+                    conn.execute('ROLLBACK')
+                    return
+                conn.executemany(
+                    "INSERT INTO job_results (job_id, seq, result) VALUES (?, ?, ?)",
+                    [(job['id'], seq + i, json.dumps(result)) for i, result in enumerate(batch)]
+                )
+                conn.execute('COMMIT')
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+            seq += len(batch)
+        
+        conn.execute(
+            "UPDATE jobs SET status = 'completed', updated_at = ? "
+            "WHERE id = ? AND status = 'running' AND owner = ?",
+            (time.time(), job['id'], self.owner)
+        )
+
+
+TRACEPARENT_RE = re.compile(r'([0-9a-f]{2})-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})(-.*)?')
+_current_span = contextvars.ContextVar('current_span', default=None)
+
+
+def parse_traceparent(header: Optional[str]) -> Optional[Tuple[str, str, bool]]:
+    """Parse a W3C traceparent header into (trace_id, parent_id, sampled), or None if invalid"""
+    if not header:
+        return None
+    match = TRACEPARENT_RE.fullmatch(header.strip())
+    if match is None:
+        return None
+    version, trace_id, parent_id, flags, rest = match.groups()
+    if version == 'ff' or (version == '00' and rest):
+        return None
+    if trace_id == '0' * 32 or parent_id == '0' * 16:
+        return None
+    return trace_id, parent_id, bool(int(flags, 16) & 1)
+
+
+class Span:
+    """
+    One timed operation within a trace
+    
+    Spans are context managers: entering makes the span current for the
+    thread so nested spans become its children, and leaving hands it to the
+    tracer's exporter. Unsampled spans keep the trace ID for propagation but
+    are never exported.
+    """
+    
+    KIND_INTERNAL = 1
+    KIND_SERVER = 2
+    KIND_CLIENT = 3
+    
+    __slots__ = ('tracer', 'name', 'kind', 'trace_id', 'span_id', 'parent_id', 'sampled',
+                 'tracestate', 'start_ns', 'end_ns', 'attributes', 'error', '_token')
+    
+    def __init__(self, tracer: 'Tracer', name: str, trace_id: str, parent_id: Optional[str],
+                 sampled: bool, kind: int = KIND_INTERNAL, tracestate: Optional[str] = None):
+        self.tracer = tracer
+        self.name = name
+        self.kind = kind
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.sampled = sampled
+        self.tracestate = tracestate
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.attributes = {}
+        self.error = None
+        self._token = None
+    
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+    
+    def headers(self) -> Dict[str, str]:
+        """W3C trace context headers for an outbound request made within this span"""
+        headers = {'traceparent': f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"}
+        if self.tracestate:
+            headers['tracestate'] = self.tracestate
+        return headers
+    
+    def __enter__(self) -> 'Span':
+        self._token = _current_span.set(self)
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        if exc is not None and self.error is None:
+            self.error = f"{exc_type.__name__}: {exc}"
+        self.end()
+    
+    def end(self):
+        if self.end_ns is not None:
+            return
+        self.end_ns = time.time_ns()
+        if self._token is not None:
+            _current_span.reset(self._token)
+            self._token = None
+        if self.sampled:
+            self.tracer.exporter.export(self)
+    
+    def to_otlp(self) -> Dict[str, Any]:
+        """The span in OTLP/JSON form"""
+        span = {
+            'traceId': self.trace_id,
+            'spanId': self.span_id,
+            'name': self.name,
+            'kind': self.kind,
+            'startTimeUnixNano': str(self.start_ns),
+            'endTimeUnixNano': str(self.end_ns),
+            'attributes': [otlp_attribute(key, value) for key, value in self.attributes.items()],
+            'status': {'code': 2, 'message': self.error} if self.error else {},
+        }
+        if self.parent_id:
+            span['parentSpanId'] = self.parent_id
+        if self.tracestate:
+            span['traceState'] = self.tracestate
+        return span
+
+
+class _NoopSpan:
+    """Stand-in used outside any trace so untraced requests cost almost nothing"""
+    
+    # Shared by every untraced request, so it must never hold state
+    __slots__ = ()
+    
+    @property
+    def error(self) -> None:
+        return None
+    
+    @error.setter
+    def error(self, value: str):
+        pass
+    
+    def set_attribute(self, key: str, value: Any):
+        pass
+    
+    def headers(self) -> Dict[str, str]:
+        return {}
+    
+    def __enter__(self) -> '_NoopSpan':
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        pass
+    
+    def end(self):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class _PropagatedContext(_NoopSpan):
+    """
+    The caller's trace context for a request this service does not record
+    
+    Stages and model calls run inside it without creating spans, and outbound
+    requests carry the caller's traceparent / tracestate unchanged.
+    """
+    
+    __slots__ = ('traceparent', 'tracestate', '_token')
+    
+    def __init__(self, traceparent: str, tracestate: Optional[str] = None):
+        self.traceparent = traceparent
+        self.tracestate = tracestate
+        self._token = _current_span.set(self)
+    
+    def headers(self) -> Dict[str, str]:
+        headers = {'traceparent': self.traceparent}
+        if self.tracestate:
+            headers['tracestate'] = self.tracestate
+        return headers
+    
+    def end(self):
+        if self._token is not None:
+            _current_span.reset(self._token)
+            self._token = None
+
+
+def otlp_attribute(key: str, value: Any) -> Dict[str, Any]:
+    """Encode one attribute as an OTLP/JSON KeyValue"""
+    if isinstance(value, bool):
+        return {'key': key, 'value': {'boolValue': value}}
+    if isinstance(value, int):
+        return {'key': key, 'value': {'intValue': str(value)}}
+    if isinstance(value, float):
+        return {'key': key, 'value': {'doubleValue': value}}
+    return {'key': key, 'value': {'stringValue': str(value)}}
+
+
+class SpanExporter:
+    """
+    Buffers finished spans and exports them in batches from a background thread
+    
+    Each batch is one OTLP/JSON ExportTraceServiceRequest, appended as a line
+    to path (the layout the OpenTelemetry Collector's file exporter writes)
+    and/or POSTed to endpoint + '/v1/traces'. Spans arriving while the buffer
+    holds max_queue are dropped rather than slowing requests down.
+    """
+    
+    def __init__(self, path: Optional[str] = None, endpoint: Optional[str] = None,
+                 batch_size: int = TRACE_BATCH_SIZE, interval: float = TRACE_EXPORT_INTERVAL,
+                 max_queue: int = TRACE_MAX_QUEUE):
+        self.path = path
+        self.endpoint = endpoint
+        self.batch_size = batch_size
+        self.interval = interval
+        self.max_queue = max_queue
+        self.exported = 0
+        self.dropped = 0
+        self.failed = 0
+        self._spans = deque()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._flush_lock = threading.Lock()
+        self._session = requests.Session() if endpoint else None
+        self._thread = threading.Thread(target=self._run, name='span-exporter', daemon=True)
+        self._thread.start()
+    
+    def export(self, span: Span):
+        """Queue a finished span; never blocks"""
+        if len(self._spans) >= self.max_queue:
+            self.dropped += 1
+            return
+        self._spans.append(span)
+        if len(self._spans) >= self.batch_size:
+            self._wake.set()
+    
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            self.flush()
+    
+    def flush(self):
+        """Export everything buffered so far"""
+        with self._flush_lock:
+            while self._spans:
+                batch = []
+                while self._spans and len(batch) < self.batch_size:
+                    batch.append(self._spans.popleft())
+                try:
+                    self._write(batch)
+                except Exception:
+                    self.failed += len(batch)
+                else:
+                    self.exported += len(batch)
+    
+    def _write(self, batch: List[Span]):
+        payload = {'resourceSpans': [{
+            'resource': {'attributes': [otlp_attribute('service.name', TRACE_SERVICE_NAME)]},
+            'scopeSpans': [{
+                'scope': {'name': __name__},
+                'spans': [span.to_otlp() for span in batch],
+            }],
+        }]}
+        if self.path:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(payload, separators=(',', ':')) + '\n')
+        if self._session is not None:
+            response = self._session.post(self.endpoint + '/v1/traces', json=payload, timeout=5)
+            response.raise_for_status()
+    
+    def shutdown(self, timeout: float = 5.0):
+        """Stop the export thread and flush what is left"""
+        self._stopped.set()
+        self._wake.set()
+        self._thread.join(timeout)
+        self.flush()
+    
+    def stats(self) -> Dict[str, int]:
+        return {
+            'queued': len(self._spans),
+            'exported': self.exported,
+            'dropped': self.dropped,
+            'failed': self.failed,
         }
 
 
+class Tracer:
+    """
+    Starts traces for incoming requests and spans within them
+    
+    Requests that are not recorded (all of them, with no exporter) create no
+    spans; an incoming traceparent is forwarded to model calls unchanged.
+    """
+    
+    def __init__(self, exporter: Optional[SpanExporter] = None, sample_rate: float = TRACE_SAMPLE_RATE):
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+    
+    def start_request(self, name: str, traceparent: Optional[str] = None,
+                      tracestate: Optional[str] = None):
+        """Open the server span for a request, continuing the caller's trace if it sent one"""
+        parent = parse_traceparent(traceparent)
+        if parent is None:
+            if self.exporter is None or random.random() >= self.sample_rate:
+                return NOOP_SPAN
+            trace_id, parent_id, tracestate = os.urandom(16).hex(), None, None
+        else:
+            trace_id, parent_id, parent_sampled = parent
+            if self.exporter is None or not (parent_sampled or random.random() < self.sample_rate):
+                # Not recorded here, so there is no span of ours for
+                # downstream services to hang off; forward the caller's as-is
+                return _PropagatedContext(traceparent.strip(), tracestate)
+        return Span(self, name, trace_id, parent_id, True, Span.KIND_SERVER, tracestate).__enter__()
+    
+    def current(self) -> Optional[Span]:
+        return _current_span.get()
+    
+    def span(self, name: str, kind: int = Span.KIND_INTERNAL, parent: Optional[Span] = None):
+        """A child of parent (default: the current span), or a no-op outside a recorded trace"""
+        if parent is None:
+            parent = _current_span.get()
+            if parent is None:
+                return NOOP_SPAN
+        if not isinstance(parent, Span):
+            return parent
+        return Span(self, name, parent.trace_id, parent.span_id, parent.sampled, kind, parent.tracestate)
+    
+    def stats(self) -> Dict[str, Any]:
+        if self.exporter is None:
+            return {'enabled': False}
+        return {'enabled': True, 'sample_rate': self.sample_rate, **self.exporter.stats()}
+
+
+def build_tracer() -> Tracer:
+    """Tracer from the TRACE_* settings, exporting only if a destination is configured"""
+    if not (TRACE_EXPORT_PATH or TRACE_OTLP_ENDPOINT):
+        return Tracer()
+    exporter = SpanExporter(TRACE_EXPORT_PATH or None, TRACE_OTLP_ENDPOINT or None)
+    atexit.register(exporter.shutdown)
+    return Tracer(exporter)
+
+
+class BackendUnavailable(Exception):
+    """No model server could answer the request"""
+
+
+class ModelEndpoint:
+    """One model server: pooled session, in-flight count and recent latencies"""
+    
+    def __init__(self, url: str, pool_size: int = OLLAMA_POOL_SIZE):
+        self.url = url
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.outstanding = 0
+        self.failures = 0
+        self.ejected_until = 0.0
+        self.latencies = deque(maxlen=200)
+    
+    def available(self, now: float) -> bool:
+        return now >= self.ejected_until
+    
+    def p95(self) -> Optional[float]:
+        """95th percentile of recent successful latencies, in seconds"""
+        if len(self.latencies) < OLLAMA_HEDGE_MIN_SAMPLES:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[int(len(ordered) * 0.95) - 1]
+
+
+class ModelRouter:
+    """
+    Routes requests across several local model servers
+    
+    Each request goes to the available endpoint with the fewest requests in
+    flight. If it has not answered after that endpoint's p95 latency (or
+    hedge_delay until enough samples exist), a hedged duplicate goes to the
+    next best endpoint and whichever answers first wins. A failed request is
+    retried on another endpoint straight away.
+    """
+    
+    def __init__(self, urls: List[str], hedge_delay: Optional[float] = OLLAMA_HEDGE_DELAY,
+                 eject_seconds: float = OLLAMA_EJECT_SECONDS, pool_size: int = OLLAMA_POOL_SIZE):
+        self.endpoints = [ModelEndpoint(url, pool_size) for url in urls]
+        self.hedge_delay = hedge_delay
+        self.eject_seconds = eject_seconds
+        self.requests = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(len(self.endpoints) * pool_size, 1), thread_name_prefix='model-router'
+        )
+    
+    def _pick(self, exclude=()) -> Optional[ModelEndpoint]:
+        """Choose the least loaded endpoint and reserve a slot on it; _send releases it"""
+        now = time.monotonic()
+        with self._lock:
+            candidates = [e for e in self.endpoints if e not in exclude and e.available(now)]
+            if not candidates:
+                return None
+            endpoint = min(candidates, key=lambda e: e.outstanding)
+            endpoint.outstanding += 1
+            return endpoint
+    
+    def _eject(self, endpoint: ModelEndpoint):
+        with self._lock:
+            endpoint.ejected_until = time.monotonic() + self.eject_seconds
+    
+    def _send(self, endpoint: ModelEndpoint, method: str, path: str, kwargs: Dict[str, Any],
+              parent: Optional[Span] = None):
+        # The slot was reserved by _pick
+        start = time.monotonic()
+        try:
+            # Worker threads do not inherit the caller's current span, so the
+            # attempt span is parented explicitly
+            span = NOOP_SPAN if parent is None else tracer.span(f'{method} {path}', Span.KIND_CLIENT, parent)
+            with span:
+                span.set_attribute('server.url', endpoint.url)
+                headers = span.headers()
+                if headers:
+                    kwargs = dict(kwargs, headers={**(kwargs.get('headers') or {}), **headers})
+                response = endpoint.session.request(method, endpoint.url + path, **kwargs)
+                span.set_attribute('http.status_code', response.status_code)
+                # Only server errors reflect on the endpoint's health; a 4xx
+                # (e.g. unknown model) is the caller's problem and goes back as-is
+                if response.status_code >= 500:
+                    response.raise_for_status()
+        except Exception:
+            with self._lock:
+                endpoint.failures += 1
+                if endpoint.failures >= OLLAMA_EJECT_FAILURES:
+                    endpoint.ejected_until = time.monotonic() + self.eject_seconds
+            raise
+        else:
+            with self._lock:
+                endpoint.failures = 0
+                endpoint.latencies.append(time.monotonic() - start)
+            return response
+        finally:
+            with self._lock:
+                endpoint.outstanding -= 1
+    
+    def request(self, method: str, path: str, **kwargs) -> requests.Response:
+        """
+        Send a request to the best endpoint, hedging to a second if it is slow
+        
+        Connection errors, timeouts and 5xx responses count against the
+        endpoint and are retried elsewhere; 4xx responses are returned to the
+        caller unchanged.
+        
+        Raises:
+            BackendUnavailable: every endpoint tried failed, or none is available
+        """
+        primary = self._pick()
+        if primary is None:
+            raise BackendUnavailable("No model server available")
+        with self._lock:
+            self.requests += 1
+        
+        parent = tracer.current()
+        tried = [primary]
+        pending = {self._executor.submit(self._send, primary, method, path, kwargs, parent): primary}
+        delay = primary.p95() or self.hedge_delay
+        hedged = self.hedge_delay is None
+        errors = []
+        
+        while pending:
+            timeout = None if hedged else delay
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                endpoint = pending.pop(future)
+                try:
+                    response = future.result()
+                except Exception as e:
+                    errors.append(f"{endpoint.url}: {e}")
+                    continue
+                if endpoint is not primary:
+                    with self._lock:
+                        self.hedge_wins += 1
+                return response
+            
+            # Hedge after the delay, or retry at once if everything so far failed
+            if not hedged or not pending:
+                backup = self._pick(exclude=tried)
+                if backup is not None:
+                    tried.append(backup)
+                    pending[self._executor.submit(self._send, backup, method, path, kwargs, parent)] = backup
+                    if not done:
+                        with self._lock:
+                            self.hedged += 1
+                hedged = True
+        
+        raise BackendUnavailable("; ".join(errors) or "No model server available")
+    
+    def probe(self, timeout: float = OLLAMA_PROBE_TIMEOUT) -> List[Dict[str, Any]]:
+        """Check every endpoint's /api/tags, ejecting the ones that fail"""
+        def check(endpoint):
+            try:
+                response = endpoint.session.get(endpoint.url + '/api/tags', timeout=timeout)
+                response.raise_for_status()
+                models = [m['name'] for m in response.json().get('models', [])]
+            except Exception as e:
+                self._eject(endpoint)
+                return {'url': endpoint.url, 'status': 'disconnected', 'error': str(e)}
+            with self._lock:
+                endpoint.failures = 0
+                endpoint.ejected_until = 0.0
+            return {'url': endpoint.url, 'status': 'connected', 'models': models}
+        
+        return list(self._executor.map(check, self.endpoints))
+    
+    def stats(self) -> Dict[str, Any]:
+        """Routing counters and per-endpoint load"""
+        now = time.monotonic()
+        with self._lock:
+            return {
+                'requests': self.requests,
+                'hedged': self.hedged,
+                'hedge_wins': self.hedge_wins,
+                'endpoints': [
+                    {
+                        'url': e.url,
+                        'outstanding': e.outstanding,
+                        'available': e.available(now),
+                        'p95_ms': None if e.p95() is None else e.p95() * 1000,
+                    }
+                    for e in self.endpoints
+                ],
+            }
+
+
 # Initialize services
 idea_gen = IdeaGenerator()
 validator = ValidationEngine()
+validation_batcher = ValidationBatcher(validator)
+idea_ranker = IdeaRanker(idea_gen, validator)
+dedup_sessions = SessionIndexes()
+model_router = ModelRouter(OLLAMA_ENDPOINTS)
+tracer = build_tracer()
+_job_queue = None
+_job_queue_lock = threading.Lock()
+
+
+def get_job_queue() -> JobQueue:
+    """Open the job store and start its workers on first use"""
+    global _job_queue
+    with _job_queue_lock:
+        if _job_queue is None:
+            _job_queue = JobQueue(JOB_DB_PATH, idea_gen, validator)
+        return _job_queue
+
+
+admission = {
+    name: AdmissionController(name, **limits)
+    for name, limits in ADMISSION_LIMITS.items()
+}
+
+
+def admission_controlled(name: str):
+    """Decorator that sheds requests with 503 when the endpoint is saturated"""
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            controller = admission[name]
+            if not controller.acquire():
+                response = jsonify({
+                    'error': 'Service overloaded, retry later',
+                    'endpoint': name
+                })
+                response.status_code = 503
+                response.headers['Retry-After'] = '1'
+                return response
+            try:
+                return view(*args, **kwargs)
+            finally:
+                controller.release()
+        return wrapper
+    return decorator
+
+
+def session_index(data: Dict[str, Any]) -> Optional[NearDuplicateIndex]:
+    """Near-duplicate index for the request's session, or None if it has none"""
+    session_id = data.get('session_id') or request.headers.get('X-Session-ID')
+    if not session_id:
+        return None
+    return dedup_sessions.get(str(session_id))
+
+
+@app.before_request
+def start_trace():
+    """Open the request's server span, continuing the caller's W3C trace context"""
+    rule = request.url_rule.rule if request.url_rule is not None else request.path
+    g.trace_span = tracer.start_request(
+        f'{request.method} {rule}',
+        request.headers.get('traceparent'),
+        request.headers.get('tracestate')
+    )
+
+
+@app.after_request
+def record_trace_status(response):
+    span = g.get('trace_span', NOOP_SPAN)
+    if isinstance(span, Span):
+        span.set_attribute('http.status_code', response.status_code)
+        if response.status_code >= 500:
+            span.error = f"HTTP {response.status_code}"
+    return response
+
+
+@app.teardown_request
+def end_trace(exc):
+    span = g.pop('trace_span', NOOP_SPAN)
+    if exc is not None and isinstance(span, Span):
+        span.error = f"{type(exc).__name__}: {exc}"
+    span.end()
+
+
+class Compressor:
+    """Incremental compressor for one Content-Encoding"""
+    
+    def __init__(self, encoding: str, level: int = COMPRESS_LEVEL):
+        self.encoding = encoding
+        if encoding == 'gzip':
+            self._obj = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        elif encoding == 'deflate':
+            self._obj = zlib.compressobj(level)
+        elif encoding == 'br':
+            self._obj = brotli.Compressor(quality=min(level, 11))
+        elif encoding == 'zstd':
+            self._obj = zstandard.ZstdCompressor(level=level).compressobj()
+        else:
+            raise ValueError(f"Unsupported encoding: {encoding}")
+    
+    def compress(self, data: bytes) -> bytes:
+        if self.encoding == 'br':
+            return self._obj.process(data)
+        return self._obj.compress(data)
+    
+    def flush(self) -> bytes:
+        """Emit everything buffered so far without ending the stream"""
+        if self.encoding == 'br':
+            return self._obj.flush()
+        if self.encoding == 'zstd':
+            return self._obj.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+        return self._obj.flush(zlib.Z_SYNC_FLUSH)
+    
+    def finish(self) -> bytes:
+        if self.encoding == 'br':
+            return self._obj.finish()
+        return self._obj.flush()
+
+
+def available_encodings() -> List[str]:
+    """Content-Encodings this process can produce, most preferred first"""
+    encodings = []
+    if zstandard is not None:
+        encodings.append('zstd')
+    if brotli is not None:
+        encodings.append('br')
+    return encodings + ['gzip', 'deflate']
+
+
+def compress_stream(chunks: Iterator[bytes], compressor: Compressor) -> Iterator[bytes]:
+    """Compress a streamed body chunk by chunk, flushing so clients see each chunk"""
+    for chunk in chunks:
+        data = compressor.compress(chunk) + compressor.flush()
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+@app.after_request
+def compress_response(response):
+    """Compress JSON/NDJSON/text responses the client accepts, above a size threshold"""
+    if response.status_code == 304:
+        # A 304 must carry the Vary of the full response, but Werkzeug strips
+        # its Content-Type; only the JSON endpoints here answer conditionally
+        response.vary.add('Accept-Encoding')
+        return response
+    if (
+        request.method == 'HEAD'
+        or response.status_code < 200
+        or response.status_code == 204
+        or response.direct_passthrough
+        or 'Content-Encoding' in response.headers
+        or not (response.mimetype or '').startswith(COMPRESSIBLE_MIMETYPES)
+    ):
+        return response
+    
+    response.vary.add('Accept-Encoding')
+    encoding = request.accept_encodings.best_match(available_encodings())
+    if encoding is None:
+        return response
+    
+    if response.is_streamed:
+        response.response = compress_stream(response.iter_encoded(), Compressor(encoding))
+        response.headers.pop('Content-Length', None)
+    else:
+        body = response.get_data()
+        if len(body) < COMPRESS_MIN_BYTES:
+            return response
+        with tracer.span('compress') as span:
+            compressor = Compressor(encoding)
+            response.set_data(compressor.compress(body) + compressor.finish())
+            span.set_attribute('http.response.content_encoding', encoding)
+            span.set_attribute('http.response.body.size', len(body))
+    
+    response.headers['Content-Encoding'] = encoding
+    # The compressed bytes differ from the identity body, so a strong ETag
+    # must not be shared between them
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def read_json_body(max_bytes: int = None) -> Any:
+    """
+    Read and decode the JSON request body without exceeding max_bytes
+    
+    The body is pulled from the input stream in fixed-size chunks so a client
+    that omits or understates Content-Length is cut off as soon as the limit
+    is crossed rather than after the whole payload has been buffered.
+    
+    Raises:
+        UnsupportedMediaType: Content-Type is not JSON
+        RequestEntityTooLarge: body is larger than max_bytes
+        BadRequest: body is not valid JSON
+    """
+    # Like request.get_json(), only accept JSON bodies; this also keeps
+    # cross-origin POSTs from skipping the CORS preflight as text/plain
+    if not request.is_json:
+        raise UnsupportedMediaType("Content-Type must be application/json")
+    
+    limit = MAX_REQUEST_BYTES if max_bytes is None else max_bytes
+    if request.content_length is not None and request.content_length > limit:
+        raise RequestEntityTooLarge(f"Request body exceeds {limit} bytes")
+    
+    with tracer.span('parse') as span:
+        body = bytearray()
+        stream = request.stream
+        while True:
+            chunk = stream.read(REQUEST_READ_CHUNK_BYTES)
+            if not chunk:
+                break
+            body += chunk
+            if len(body) > limit:
+                raise RequestEntityTooLarge(f"Request body exceeds {limit} bytes")
+        span.set_attribute('http.request.body.size', len(body))
+        
+        try:
+            # JSON bodies are UTF-8 (RFC 8259); decoding up front avoids the slower
+            # encoding sniffing json.loads applies to raw bytes
+            return json.loads(body.decode('utf-8'))
+        except ValueError as e:
+            raise BadRequest(f"Invalid JSON body: {e}")
+
+
+@app.errorhandler(HTTPException)
+def handle_http_error(e):
+    """Return HTTP errors as JSON so API clients get a consistent shape"""
+    return jsonify({'error': e.description}), e.code
 
 
 @app.route('/api/health', methods=['GET'])
 def health_check():
-    """Health check endpoint"""
+    """Health check endpoint (never queued or shed)"""
     return jsonify({
         'status': 'healthy',
         'service': 'Local AI Service',
         'model': AI_MODEL,
+        'admission': {name: controller.stats() for name, controller in admission.items()},
+        'dedup': dedup_sessions.stats(),
+        'tracing': tracer.stats(),
         'timestamp': time.time()
     })
 
 
 @app.route('/api/generate', methods=['POST'])
+@admission_controlled('generate')
 def generate():
     """Generate AI-enhanced business ideas"""
     try:
-        data = request.get_json()
+        data = read_json_body()
         prompt = data.get('prompt', '')
         category = data.get('category', 'businesses')
         context = data.get('context', {})
         
-        # Simulate processing time
-        time.sleep(0.3)
+        index = session_index(data)
+        model = AI_MODEL
         
         # Generate idea
-        if 'enhance' in prompt.lower():
+        if data.get('model'):
+            # Forward to a local model server
+            model = data['model']
+            try:
+                with tracer.span('backend') as span:
+                    span.set_attribute('model', model)
+                    response = model_router.request(
+                        'POST', '/api/generate',
+                        json={'model': model, 'prompt': prompt, 'stream': False},
+                        timeout=OLLAMA_TIMEOUT
+                    )
+            except BackendUnavailable as e:
+                return jsonify({'error': str(e)}), 502
+            if response.status_code >= 400:
+                # Client errors from the model server (such as an unknown model)
+                try:
+                    error = response.json().get('error') or response.text
+                except ValueError:
+                    error = response.text
+                return jsonify({'error': error, 'model': model}), response.status_code
+            with tracer.span('compute'):
+                response_text = response.json().get('response', '')
+                near_duplicate = index is not None and index.check_and_add(response_text) is not None
+        elif 'enhance' in prompt.lower():
+            # Simulate processing time
+            with tracer.span('delay'):
+                time.sleep(0.3)
+            
             # Enhanced idea generation
-            base_idea = prompt.split('"')[1] if '"' in prompt else ''
-            enhanced = f"{base_idea}\n\nTexas Market Advantages:\n- Strong economic growth\n- Business-friendly regulations\n- Access to diverse markets\n\nEstimated Startup: $25,000-$75,000\nTarget Demographics: Texas professionals and entrepreneurs"
-            response_text = enhanced
+            with tracer.span('compute'):
+                response_text = idea_gen.enhance(prompt)
+                near_duplicate = index is not None and index.check_and_add(response_text) is not None
         else:
-            response_text = idea_gen.generate_idea(category, context)
+            # Simulate processing time
+            with tracer.span('delay'):
+                time.sleep(0.3)
+            
+            # Retry a few times when the session has already seen a near-duplicate
+            with tracer.span('compute') as span:
+                for attempt in range(1, DEDUP_MAX_ATTEMPTS + 1):
+                    response_text = idea_gen.generate_idea(category, context)
+                    near_duplicate = index is not None and index.check_and_add(response_text) is not None
+                    if not near_duplicate:
+                        break
+                span.set_attribute('attempts', attempt)
         
-        return jsonify({
-            'text': response_text,
-            'confidence': 0.85,
-            'model': AI_MODEL,
-            'timestamp': time.time()
-        })
+        with tracer.span('serialize'):
+            return jsonify({
+                'text': response_text,
+                'near_duplicate': near_duplicate,
+                'confidence': 0.85,
+                'model': model,
+                'timestamp': time.time()
+            })
     
+    except HTTPException:
+        raise
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/generate/top', methods=['POST'])
+@admission_controlled('generate_top')
+def generate_top():
+    """Generate many candidate ideas and return the K most feasible"""
+    try:
+        data = read_json_body()
+        if not isinstance(data, dict):
+            raise BadRequest("Request body must be a JSON object")
+        category = data.get('category', 'businesses')
+        k = data.get('k', 5)
+        max_candidates = data.get('max_candidates', 1000)
+        profile = data.get('profile', {})
+        
+        if category not in idea_gen.category_templates:
+            raise BadRequest(f"Unknown category: {category}")
+        if not isinstance(k, int) or not 1 <= k <= RANK_MAX_K:
+            raise BadRequest(f"k must be an integer between 1 and {RANK_MAX_K}")
+        if not isinstance(max_candidates, int) or not 1 <= max_candidates <= RANK_MAX_CANDIDATES:
+            raise BadRequest(f"max_candidates must be an integer between 1 and {RANK_MAX_CANDIDATES}")
+        if not isinstance(profile, dict) or not all(isinstance(value, str) for value in profile.values()):
+            raise BadRequest("profile must be an object of strings")
+        
+        index = session_index(data)
+        exclude = None if index is None else (lambda text: index.query(text) is not None)
+        with tracer.span('compute') as span:
+            result = idea_ranker.top_k(category, k, max_candidates, profile, data.get('context', {}), exclude)
+            if index is not None:
+                for idea in result['ideas']:
+                    index.add(idea['text'])
+            span.set_attribute('explored', result['explored'])
+        
+        with tracer.span('serialize'):
+            return jsonify({
+                'ideas': result['ideas'],
+                'explored': result['explored'],
+                'stopped_early': result['stopped_early'],
+                'model': AI_MODEL,
+                'rules_version': validator.version,
+                'timestamp': time.time()
+            })
+    
+    except HTTPException:
+        raise
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
 @app.route('/api/validate', methods=['POST'])
+@admission_controlled('validate')
 def validate():
     """Validate business concept"""
     try:
-        data = request.get_json()
+        data = read_json_body()
         
         # Perform validation
-        result = validator.calculate_feasibility(data)
+        with tracer.span('compute'):
+            if VALIDATE_BATCHING:
+                result = validation_batcher.submit(data).result()
+            else:
+                result = validator.calculate_feasibility(data)
         
-        return jsonify({
-            'feasibility_score': result['score'],
-            'factors': result['factors'],
-            'recommendation': result['recommendation'],
-            'timestamp': time.time()
-        })
+        with tracer.span('serialize'):
+            return jsonify({
+                'feasibility_score': result['score'],
+                'factors': result['factors'],
+                'recommendation': result['recommendation'],
+                'rules_version': validator.version,
+                'timestamp': time.time()
+            })
     
+    except HTTPException:
+        raise
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/api/jobs', methods=['POST'])
+def submit_job():
+    """Queue a bulk generation or validation job"""
+    data = read_json_body()
+    if not isinstance(data, dict):
+        raise BadRequest("Request body must be a JSON object")
+    params = data.get('params', {})
+    if not isinstance(params, dict):
+        raise BadRequest("params must be an object")
+    try:
+        job = get_job_queue().submit(data.get('kind'), params)
+    except ValueError as e:
+        raise BadRequest(str(e))
+    
+    response = jsonify(job)
+    response.status_code = 202
+    response.headers['Location'] = f"/api/jobs/{job['id']}"
+    return response
+
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    """Poll a job's status and progress"""
+    job = get_job_queue().get(job_id)
+    if job is None:
+        raise NotFound(f"Unknown job: {job_id}")
+    return jsonify(job)
+
+
+@app.route('/api/jobs/<job_id>/results', methods=['GET'])
+def job_results(job_id):
+    """Fetch a page of a job's results (?offset=0&limit=100), or all as NDJSON (?format=ndjson)"""
+    queue = get_job_queue()
+    job = queue.get(job_id)
+    if job is None:
+        raise NotFound(f"Unknown job: {job_id}")
+    
+    offset = request.args.get('offset', 0, type=int)
+    limit = request.args.get('limit', 100, type=int)
+    if offset < 0 or not 1 <= limit <= JOB_RESULTS_MAX_LIMIT:
+        raise BadRequest(f"offset must be >= 0 and limit between 1 and {JOB_RESULTS_MAX_LIMIT}")
+    
+    if request.args.get('format') == 'ndjson':
+        # Stream every committed result from offset on, one JSON object per
+        # line; each page is sent (and compressed) as a single chunk
+        chunks = (
+            ''.join(json.dumps(result) + '\n' for result in page)
+            for page in queue.iter_result_pages(job_id, offset)
+        )
+        return app.response_class(chunks, mimetype='application/x-ndjson')
+    
+    results = queue.results(job_id, offset, limit)
+    next_offset = offset + len(results)
+    # A cancelled or failed job never reaches its total; its committed
+    # results are all there will ever be
+    end = job['completed'] if job['status'] in JobQueue.FINISHED else job['total']
+    return jsonify({
+        'job': job,
+        'results': results,
+        'offset': offset,
+        'next_offset': next_offset if next_offset < end else None
+    })
+
+
+@app.route('/api/jobs/<job_id>', methods=['DELETE'])
+def cancel_job(job_id):
+    """Cancel a queued or running job"""
+    queue = get_job_queue()
+    if not queue.cancel(job_id):
+        job = queue.get(job_id)
+        if job is None:
+            raise NotFound(f"Unknown job: {job_id}")
+        return jsonify({'error': f"Job already {job['status']}", 'job': job}), 409
+    return jsonify(queue.get(job_id))
+
+
+@app.route('/api/scoring-rules', methods=['GET'])
+def scoring_rules():
+    """Serve the feasibility scoring spec with ETag / conditional GET support"""
+    response = app.response_class(validator.rules_json, mimetype='application/json')
+    response.set_etag(validator.rules_etag)
+    response.headers['Cache-Control'] = f'public, max-age={SCORING_RULES_MAX_AGE}'
+    return response.make_conditional(request)
+
+
 @app.route('/api/ollama/status', methods=['GET'])
+@admission_controlled('ollama_status')
 def ollama_status():
-    """Check Ollama service status"""
-    try:
-        import requests
-        response = requests.get('http://localhost:11434/api/tags', timeout=2)
-        models = response.json().get('models', [])
+    """Check Ollama service status on every configured endpoint"""
+    endpoints = model_router.probe()
+    connected = [e for e in endpoints if e['status'] == 'connected']
+    if connected:
+        models = []
+        for endpoint in connected:
+            models.extend(m for m in endpoint['models'] if m not in models)
         return jsonify({
             'status': 'connected',
-            'available_models': [m['name'] for m in models]
-        })
-    except Exception as e:
-        return jsonify({
-            'status': 'disconnected',
-            'error': str(e)
+            'available_models': models,
+            'endpoints': endpoints,
+            'routing': model_router.stats()
         })
+    return jsonify({
+        'status': 'disconnected',
+        'error': endpoints[0]['error'] if endpoints else 'No model endpoints configured',
+        'endpoints': endpoints,
+        'routing': model_router.stats()
+    })
 
 
 if __name__ == '__main__':
@@ -226,12 +2266,26 @@ if __name__ == '__main__':
     print("Endpoints:")
     print("  - GET  /api/health         - Health check")
     print("  - POST /api/generate       - Generate ideas")
+    print("  - POST /api/generate/top   - Generate and rank the top-K ideas")
     print("  - POST /api/validate       - Validate business concept")
+    print("  - GET  /api/scoring-rules  - Feasibility scoring spec (ETag)")
+    print("  - POST /api/jobs           - Submit bulk generate/validate job")
+    print("  - GET  /api/jobs/<id>      - Job status (DELETE to cancel)")
+    print("  - GET  /api/jobs/<id>/results - Paginated job results")
     print("  - GET  /api/ollama/status  - Check Ollama status")
     
     # Use environment variable for host binding
     host = os.environ.get('FLASK_HOST', '127.0.0.1')
     print(f"Binding to {host} (set FLASK_HOST=0.0.0.0 for network access)")
     
+    # Resume any jobs interrupted by the last shutdown
+    get_job_queue()
+    
+    # HTTP/1.1 so streamed NDJSON results go out with chunked encoding. The
+    # development server still closes every connection; run under gunicorn
+    # with --keep-alive for connection reuse (see README)
+    from werkzeug.serving import WSGIRequestHandler
+    WSGIRequestHandler.protocol_version = 'HTTP/1.1'
+    
     # Production mode - debug should be False for security
     app.run(host=host, port=PORT, debug=False)
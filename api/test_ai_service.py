@@ -74,6 +74,82 @@ class TestIdeaGenerator(unittest.TestCase):
         self.assertGreater(len(idea), 0)
 
 
+class TestTemplates(unittest.TestCase):
+    """Test cases for compiled idea and enhancement templates"""
+    
+    SLOTS = ('focus', 'location')
+    
+    def test_render_matches_format(self):
+        """Test that compiled templates render exactly like str.format"""
+        for source in lai_service.IDEA_TEMPLATES.values():
+            template = lai_service.CompiledTemplate('t', source, self.SLOTS)
+            self.assertEqual(
+                template.render(focus='skilled trades', location='Austin'),
+                source.format(focus='skilled trades', location='Austin')
+            )
+    
+    def test_literal_braces_and_unused_slots(self):
+        """Test escaped braces and that unused slots may be omitted"""
+        template = lai_service.CompiledTemplate('t', '{{json}} in {location}', self.SLOTS)
+        self.assertEqual(template.render(location='Houston'), '{json} in Houston')
+        self.assertEqual(template.used_slots, ('location',))
+        self.assertEqual(lai_service.CompiledTemplate('t', '', self.SLOTS).render(), '')
+        
+        with self.assertRaises(TypeError):
+            template.render(focus='retail')
+    
+    def test_invalid_templates_rejected_at_load(self):
+        """Test that bad slots and syntax fail when the template is loaded"""
+        for source in ('{unknown}', '{}', '{0}', '{focus.upper}', '{focus[0]}',
+                       '{focus:>10}', '{focus!r}', 'unbalanced {focus', 'stray }'):
+            with self.assertRaises(lai_service.TemplateError, msg=source):
+                lai_service.CompiledTemplate('t', source, self.SLOTS)
+        with self.assertRaises(lai_service.TemplateError):
+            lai_service.CompiledTemplate('t', '{class}', ('class',))
+    
+    def test_template_set_reports_every_error(self):
+        """Test that a template set lists all invalid templates together"""
+        with self.assertRaises(lai_service.TemplateError) as ctx:
+            lai_service.TemplateSet({'ok': '{focus}', 'bad1': '{nope}', 'bad2': 7}, self.SLOTS)
+        self.assertIn("'bad1'", str(ctx.exception))
+        self.assertIn("'bad2'", str(ctx.exception))
+        self.assertNotIn("'ok'", str(ctx.exception))
+    
+    def test_large_template_set(self):
+        """Test that thousands of templates load and render independently"""
+        templates = {f'variant-{i}': f'Idea {i}: {{focus}} near {{location}}' for i in range(3000)}
+        templates.update({f'shared-{i}': 'Shared {focus}' for i in range(1000)})
+        template_set = lai_service.TemplateSet(templates, self.SLOTS)
+        
+        self.assertEqual(len(template_set), 4000)
+        self.assertEqual(
+            template_set.render('variant-2999', focus='retail', location='Dallas'),
+            'Idea 2999: retail near Dallas'
+        )
+        self.assertIs(template_set.get('shared-0'), template_set.get('shared-999'))
+        self.assertIsNone(template_set.get('missing'))
+    
+    def test_custom_templates_drive_generator(self):
+        """Test that IdeaGenerator renders templates it is given"""
+        generator = IdeaGenerator(idea_templates={'jobs': 'Work in {focus}'})
+        
+        self.assertTrue(generator.generate_idea('jobs').startswith('Work in '))
+        self.assertEqual(generator.generate_idea('contracts'), 'Generate innovative Texas-focused opportunity')
+        with self.assertRaises(lai_service.TemplateError):
+            IdeaGenerator(idea_templates={'jobs': 'Work in {sector}'})
+    
+    def test_enhance_extracts_quoted_idea(self):
+        """Test that enhancement uses the first quoted idea in the prompt"""
+        generator = IdeaGenerator()
+        prompts = ['Based on "Taco truck" and "other"', 'Based on "Taco truck', 'No quotes', '""']
+        
+        for prompt in prompts:
+            legacy = prompt.split('"')[1] if '"' in prompt else ''
+            enhanced = generator.enhance(prompt)
+            self.assertEqual(enhanced, lai_service.ENHANCEMENT_TEMPLATE.format(idea=legacy))
+        self.assertTrue(generator.enhance(prompts[0]).startswith('Taco truck\n\nTexas Market Advantages'))
+
+
 class TestValidationEngine(unittest.TestCase):
     """Test cases for ValidationEngine class"""
     
@@ -151,6 +227,810 @@ class TestValidationEngine(unittest.TestCase):
         self.assertIn('factors', result)
         self.assertIsInstance(result['factors'], list)
         self.assertGreater(len(result['factors']), 0)
+    
+    def test_custom_rules_change_scoring(self):
+        """Test that the engine scores from the rule spec it is given"""
+        import copy
+        rules = copy.deepcopy(lai_service.SCORING_RULES)
+        rules['budget']['weight'] = 50
+        
+        engine = ValidationEngine(rules)
+        result = engine.calculate_feasibility({'estimatedBudget': '$10'})
+        
+        self.assertEqual(result['score'], 50)
+        self.assertNotEqual(engine.rules_etag, self.validator.rules_etag)
+    
+    def test_recommendation_uses_unrounded_score(self):
+        """Test the rounding rules the JS bridge mirrors from the spec"""
+        data = {
+            'businessType': 'Tech',
+            'businessGoals': 'Serve the local community and every customer in Texas. ' * 3,
+            'accommodationNeeds': 'a' * 101,
+            'targetMarket': 'x' * 51,
+            'estimatedBudget': '$5'
+        }
+        
+        result = self.validator.calculate_feasibility(data)
+        
+        # 79.5 points: rounded half to even for display, below 80 for the label
+        self.assertEqual(result['score'], 80)
+        self.assertEqual(result['recommendation'], 'Moderate feasibility')
+    
+    def test_invalid_rules_rejected(self):
+        """Test that an incomplete rule spec fails at load time"""
+        import copy
+        rules = copy.deepcopy(lai_service.SCORING_RULES)
+        del rules['market']
+        
+        with self.assertRaises(ValueError):
+            ValidationEngine(rules)
+    
+    def test_frontend_rules_fixture_matches(self):
+        """Test that the frontend's built-in rule spec is the one the service serves"""
+        path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'lib', 'scoring-rules.json')
+        with open(path) as f:
+            self.assertEqual(json.load(f), lai_service.SCORING_RULES)
+    
+    def test_market_alignment_case_insensitive(self):
+        """Test that market keywords match regardless of case"""
+        data = {
+            'targetMarket': 'TEXAS Local COMMUNITY',
+            'businessGoals': 'Grow Market share with every Customer'
+        }
+        
+        result = self.validator.calculate_feasibility(data)
+        
+        self.assertIn('Market Alignment: 100%', result['factors'])
+    
+    def test_large_fields_scored(self):
+        """Test that very large text fields are scored like short ones"""
+        data = {
+            'businessGoals': 'x' * 500000 + ' community',
+            'accommodationNeeds': 'y' * 500000,
+            'targetMarket': 'z' * 51
+        }
+        
+        result = self.validator.calculate_feasibility(data)
+        
+        self.assertIn('Detail Level: 100%', result['factors'])
+        self.assertIn('Market Alignment: 20%', result['factors'])
+    
+    def test_batch_scoring_matches_individual(self):
+        """Test that the shared batch keyword scan scores like one submission at a time"""
+        items = [
+            {},
+            {'targetMarket': 'TEXAS Local', 'businessGoals': 'texas customers'},
+            {'targetMarket': 'loc', 'businessGoals': 'al market'},
+            {'businessGoals': 'x' * 100000 + ' community'},
+            {'targetMarket': 'İstanbul local', 'estimatedBudget': '$5'},
+            {'targetMarket': 'community market'},
+        ]
+        
+        self.assertEqual(
+            self.validator.calculate_feasibility_batch(items),
+            [self.validator.calculate_feasibility(data) for data in items]
+        )
+        self.assertEqual(self.validator.calculate_feasibility_batch([]), [])
+
+
+class TestAdmissionController(unittest.TestCase):
+    """Test cases for AdmissionController concurrency limiting"""
+    
+    def test_admits_up_to_max_concurrent(self):
+        """Test that requests are admitted while slots are free"""
+        controller = lai_service.AdmissionController('test', max_concurrent=2, max_queue=0)
+        
+        self.assertTrue(controller.acquire())
+        self.assertTrue(controller.acquire())
+        self.assertFalse(controller.acquire())
+        
+        stats = controller.stats()
+        self.assertEqual(stats['active'], 2)
+        self.assertEqual(stats['admitted'], 2)
+        self.assertEqual(stats['shed'], 1)
+    
+    def test_release_frees_slot(self):
+        """Test that releasing a slot admits the next request"""
+        controller = lai_service.AdmissionController('test', max_concurrent=1, max_queue=0)
+        
+        self.assertTrue(controller.acquire())
+        controller.release()
+        self.assertTrue(controller.acquire())
+        self.assertEqual(controller.stats()['active'], 1)
+    
+    def test_queued_request_times_out(self):
+        """Test that a queued request gives up after queue_timeout"""
+        controller = lai_service.AdmissionController(
+            'test', max_concurrent=1, max_queue=1, queue_timeout=0.01
+        )
+        
+        self.assertTrue(controller.acquire())
+        self.assertFalse(controller.acquire())
+        
+        stats = controller.stats()
+        self.assertEqual(stats['timed_out'], 1)
+        self.assertEqual(stats['queued'], 0)
+    
+    def test_queued_request_admitted_on_release(self):
+        """Test that a waiting request takes the slot when it is released"""
+        import threading
+        
+        controller = lai_service.AdmissionController(
+            'test', max_concurrent=1, max_queue=1, queue_timeout=5
+        )
+        self.assertTrue(controller.acquire())
+        
+        results = []
+        waiter = threading.Thread(target=lambda: results.append(controller.acquire()))
+        waiter.start()
+        while controller.stats()['queued'] == 0:
+            pass
+        controller.release()
+        waiter.join()
+        
+        self.assertEqual(results, [True])
+
+
+class TestValidationBatcher(unittest.TestCase):
+    """Test cases for micro-batched validation"""
+    
+    def setUp(self):
+        self.validator = ValidationEngine()
+        self.batcher = lai_service.ValidationBatcher(self.validator, window_ms=5, max_batch_size=8)
+    
+    def test_batch_matches_individual_scoring(self):
+        """Test that batched results match calculate_feasibility"""
+        items = [
+            {},
+            {'businessName': 'Test'},
+            {'businessName': 'Test', 'targetMarket': 'Texas local market', 'estimatedBudget': '$5'},
+        ]
+        
+        # A long window that closes as soon as the batch is full, so all three share it
+        batcher = lai_service.ValidationBatcher(self.validator, window_ms=2000, max_batch_size=len(items))
+        futures = [batcher.submit(data) for data in items]
+        results = [future.result(timeout=5) for future in futures]
+        
+        self.assertEqual(results, [self.validator.calculate_feasibility(data) for data in items])
+        self.assertEqual(batcher.stats()['items'], 3)
+        self.assertEqual(batcher.stats()['batches'], 1)
+    
+    def test_bad_submission_fails_alone(self):
+        """Test that an invalid submission does not fail the rest of its batch"""
+        good = self.batcher.submit({'businessName': 'Test'})
+        bad = self.batcher.submit({'businessGoals': 42})
+        
+        self.assertIn('score', good.result(timeout=5))
+        with self.assertRaises(TypeError):
+            bad.result(timeout=5)
+
+
+class TestIdeaRanker(unittest.TestCase):
+    """Test cases for the generate-and-rank pipeline"""
+    
+    def setUp(self):
+        self.ranker = lai_service.IdeaRanker(IdeaGenerator(), ValidationEngine(), batch_size=16, patience=2)
+    
+    def test_top_k_sorted_and_unique(self):
+        """Test that at most k unique ideas come back best first"""
+        result = self.ranker.top_k('businesses', 5, 500, {'businessName': 'Test'})
+        
+        scores = [idea['score'] for idea in result['ideas']]
+        texts = [idea['text'] for idea in result['ideas']]
+        self.assertEqual(len(result['ideas']), 5)
+        self.assertEqual(scores, sorted(scores, reverse=True))
+        self.assertEqual(len(set(texts)), len(texts))
+    
+    def test_top_k_respects_max_candidates(self):
+        """Test that exploration never exceeds max_candidates"""
+        ranker = lai_service.IdeaRanker(IdeaGenerator(), ValidationEngine(), batch_size=16, patience=1000)
+        
+        result = ranker.top_k('jobs', 3, 40)
+        
+        self.assertEqual(result['explored'], 40)
+        self.assertFalse(result['stopped_early'])
+    
+    def test_top_k_stops_when_stable(self):
+        """Test early termination once the top K stops changing"""
+        result = self.ranker.top_k('contracts', 1, 5000)
+        
+        self.assertTrue(result['stopped_early'])
+        self.assertLess(result['explored'], 5000)
+
+
+class TestNearDuplicateIndex(unittest.TestCase):
+    """Test cases for MinHash/LSH near-duplicate detection"""
+    
+    IDEA = "Launch a retail innovation in Austin leveraging Texas market advantages and sustainable business practices"
+    
+    def setUp(self):
+        self.index = lai_service.NearDuplicateIndex(capacity=100)
+    
+    def test_exact_and_near_duplicates_found(self):
+        """Test that identical and slightly edited text is matched"""
+        item_id = self.index.add(self.IDEA)
+        
+        exact = self.index.query(self.IDEA)
+        near = self.index.query(self.IDEA + " today")
+        
+        self.assertEqual(exact, (item_id, 1.0))
+        self.assertEqual(near[0], item_id)
+        self.assertGreaterEqual(near[1], self.index.threshold)
+    
+    def test_distinct_ideas_not_matched(self):
+        """Test that ideas from different templates are not duplicates"""
+        self.index.add(self.IDEA)
+        
+        other = "Secure municipal services opportunities in Houston region supporting public infrastructure"
+        self.assertIsNone(self.index.query(other))
+    
+    def test_distinct_templated_ideas_not_flagged(self):
+        """Test that every distinct idea of a category can be served in one session"""
+        generator = IdeaGenerator()
+        for category, source in lai_service.IDEA_TEMPLATES.items():
+            index = lai_service.NearDuplicateIndex(capacity=100)
+            ideas = {
+                source.format(focus=focus, location=location)
+                for focus in generator.category_templates[category]
+                for location in generator.texas_keywords
+            }
+            flagged = [idea for idea in ideas if index.check_and_add(idea) is not None]
+            self.assertEqual(flagged, [], category)
+            self.assertEqual(len(index), 45)
+    
+    def test_check_and_add(self):
+        """Test that only the first of two duplicates is indexed"""
+        self.assertIsNone(self.index.check_and_add(self.IDEA))
+        self.assertIsNotNone(self.index.check_and_add(self.IDEA))
+        self.assertEqual(len(self.index), 1)
+    
+    def test_capacity_evicts_oldest(self):
+        """Test that the index never grows past capacity"""
+        index = lai_service.NearDuplicateIndex(capacity=2)
+        index.add(self.IDEA)
+        index.add("Build a consulting practice business serving the Dallas area")
+        index.add("Secure government contracting opportunities in El Paso region")
+        
+        self.assertEqual(len(index), 2)
+        self.assertEqual(index.stats()['evicted'], 1)
+        self.assertIsNone(index.query(self.IDEA))
+    
+    def test_session_indexes_bounded(self):
+        """Test that least recently used sessions are dropped"""
+        sessions = lai_service.SessionIndexes(max_sessions=2)
+        first = sessions.get('a')
+        sessions.get('b')
+        sessions.get('a')
+        sessions.get('c')
+        
+        self.assertIs(sessions.get('a'), first)
+        self.assertEqual(sessions.stats()['sessions'], 2)
+    
+    def test_session_indexes_cap_total_ideas(self):
+        """Test that sessions are dropped once their ideas exceed the global cap"""
+        sessions = lai_service.SessionIndexes(max_indexed=5)
+        for session_id in ('a', 'b', 'c'):
+            index = sessions.get(session_id)
+            for i in range(3):
+                index.add(f"{self.IDEA} number {session_id} {i}")
+        
+        # Touching c drops the least recently used sessions until the total fits
+        sessions.get('c')
+        stats = sessions.stats()
+        self.assertEqual(stats['sessions'], 1)
+        self.assertEqual(stats['indexed'], 3)
+        self.assertEqual(stats['evicted'], 2)
+        
+        # A single session over the cap is kept; its own capacity bounds it
+        for i in range(3):
+            index.add(f"{self.IDEA} extra {i}")
+        self.assertIs(sessions.get('c'), index)
+
+
+class TestJobQueue(unittest.TestCase):
+    """Test cases for the durable background job queue"""
+    
+    def setUp(self):
+        import tempfile
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'jobs.db')
+        self.queues = []
+    
+    def tearDown(self):
+        for queue in self.queues:
+            queue.stop(timeout=5)
+        self.tmpdir.cleanup()
+    
+    def make_queue(self, workers=1):
+        queue = lai_service.JobQueue(
+            self.path, IdeaGenerator(), ValidationEngine(),
+            workers=workers, write_batch=10, poll_interval=0.01
+        )
+        self.queues.append(queue)
+        return queue
+    
+    def wait_for(self, queue, job_id):
+        import time
+        deadline = time.time() + 10
+        while time.time() < deadline:
+            job = queue.get(job_id)
+            if job['status'] in lai_service.JobQueue.FINISHED:
+                return job
+            time.sleep(0.01)
+        self.fail(f"job {job_id} did not finish")
+    
+    def test_validate_job_results_paginated(self):
+        """Test that a validation job scores every item in order"""
+        queue = self.make_queue()
+        items = [{'businessName': f'Business {i}', 'estimatedBudget': f'${i}'} for i in range(25)]
+        
+        job = queue.submit('validate', {'items': items})
+        done = self.wait_for(queue, job['id'])
+        
+        self.assertEqual(done['status'], 'completed')
+        self.assertEqual(done['completed'], 25)
+        page = queue.results(job['id'], 20, 10)
+        self.assertEqual(len(page), 5)
+        self.assertEqual(page[0], ValidationEngine().calculate_feasibility(items[20]))
+    
+    def test_generate_job(self):
+        """Test that a generation job produces the requested number of ideas"""
+        queue = self.make_queue()
+        
+        job = queue.submit('generate', {'category': 'jobs', 'count': 15})
+        self.wait_for(queue, job['id'])
+        
+        results = queue.results(job['id'], 0, 100)
+        self.assertEqual(len(results), 15)
+        self.assertIn('AI-optimized position', results[0]['text'])
+    
+    def test_invalid_job_rejected(self):
+        """Test that bad kinds and params raise ValueError"""
+        queue = self.make_queue(workers=0)
+        
+        for kind, params in (('unknown', {}), ('generate', {'category': 'jobs', 'count': 0}),
+                             ('validate', {'items': 'nope'})):
+            with self.assertRaises(ValueError):
+                queue.submit(kind, params)
+    
+    def test_cancel_queued_job(self):
+        """Test that a queued job can be cancelled exactly once"""
+        queue = self.make_queue(workers=0)
+        job = queue.submit('generate', {'category': 'jobs', 'count': 5})
+        
+        self.assertTrue(queue.cancel(job['id']))
+        self.assertFalse(queue.cancel(job['id']))
+        self.assertEqual(queue.get(job['id'])['status'], 'cancelled')
+    
+    def test_interrupted_job_resumes_after_restart(self):
+        """Test that a job left running by a dead process is finished on restart"""
+        queue = self.make_queue(workers=0)
+        items = [{'businessName': 'Test'}] * 30
+        job = queue.submit('validate', {'items': items})
+        
+        # Simulate a crash after the first committed batch, long enough ago
+        # that the dead owner's lease has expired
+        import time
+        conn = queue._connect()
+        conn.execute(
+            "UPDATE jobs SET status = 'running', completed = 10, owner = 'dead', updated_at = ? WHERE id = ?",
+            (time.time() - lai_service.JOB_LEASE_SECONDS - 1, job['id'])
+        )
+        conn.executemany(
+            "INSERT INTO job_results (job_id, seq, result) VALUES (?, ?, ?)",
+            [(job['id'], i, json.dumps({'score': -1})) for i in range(10)]
+        )
+        
+        restarted = self.make_queue()
+        done = self.wait_for(restarted, job['id'])
+        
+        self.assertEqual(done['status'], 'completed')
+        results = restarted.results(job['id'], 0, 100)
+        self.assertEqual(len(results), 30)
+        self.assertEqual(results[9], {'score': -1})
+        self.assertNotEqual(results[10], {'score': -1})
+    
+    def test_live_lease_not_reclaimed(self):
+        """Test that a job another live process is running is left alone"""
+        import time
+        queue = self.make_queue(workers=0)
+        job = queue.submit('validate', {'items': [{'businessName': 'Test'}] * 30})
+        conn = queue._connect()
+        conn.execute(
+            "UPDATE jobs SET status = 'running', owner = 'other', updated_at = ? WHERE id = ?",
+            (time.time(), job['id'])
+        )
+        
+        second = self.make_queue()
+        time.sleep(0.2)
+        self.assertEqual(second.get(job['id'])['status'], 'running')
+        self.assertEqual(second.get(job['id'])['completed'], 0)
+        
+        # Once the lease lapses the job is taken over and finished
+        conn.execute("UPDATE jobs SET updated_at = 0 WHERE id = ?", (job['id'],))
+        self.assertEqual(self.wait_for(second, job['id'])['status'], 'completed')
+    
+    def test_queues_share_database(self):
+        """Test that a second queue opened mid-job does not claim it again"""
+        import time
+        first = self.make_queue()
+        job = first.submit('generate', {'category': 'jobs', 'count': 3000})
+        while first.get(job['id'])['status'] == 'queued':
+            time.sleep(0.001)
+        
+        second = self.make_queue()
+        done = self.wait_for(second, job['id'])
+        
+        self.assertEqual(done['status'], 'completed')
+        self.assertEqual(done['completed'], 3000)
+        self.assertEqual(len(second.results(job['id'], 0, 5000)), 3000)
+    
+    def test_worker_survives_database_errors(self):
+        """Test that a failing claim is retried instead of killing the worker"""
+        import sqlite3
+        import threading
+        queue = self.make_queue(workers=0)
+        claim = queue._claim
+        calls = []
+        
+        def flaky_claim():
+            calls.append(1)
+            if len(calls) <= 2:
+                raise sqlite3.OperationalError('database is locked')
+            return claim()
+        
+        queue._claim = flaky_claim
+        with patch.object(lai_service.app.logger, 'exception') as log:
+            thread = threading.Thread(target=queue._work, daemon=True)
+            queue._threads.append(thread)
+            thread.start()
+            job = queue.submit('validate', {'items': [{'businessName': 'Test'}] * 5})
+            
+            self.assertEqual(self.wait_for(queue, job['id'])['status'], 'completed')
+            self.assertTrue(thread.is_alive())
+            self.assertEqual(log.call_count, 2)
+
+
+class StubModelServer:
+    """Local Ollama-like server with injectable delay and failures"""
+    
+    def __init__(self, name, delay=0.0, fail=False):
+        import threading
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        
+        stub = self
+        self.name = name
+        self.delay = delay
+        self.fail = fail
+        self.hits = 0
+        self.headers = {}
+        
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+            
+            def reply(self, payload, status=200):
+                import time
+                stub.hits += 1
+                stub.headers = dict(self.headers)
+                time.sleep(stub.delay)
+                body = json.dumps(payload).encode()
+                self.send_response(500 if stub.fail else status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def do_GET(self):
+                self.reply({'models': [{'name': stub.name}]})
+            
+            def do_POST(self):
+                request = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                model = request.get('model', stub.name)
+                if model != stub.name:
+                    # Ollama answers 404 for a model it does not have
+                    self.reply({'error': f"model '{model}' not found"}, status=404)
+                else:
+                    self.reply({'response': f'idea from {stub.name}'})
+        
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}'
+        threading.Thread(target=self.server.serve_forever, args=(0.01,), daemon=True).start()
+    
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class TestModelRouter(unittest.TestCase):
+    """Test cases for load-balanced, hedged model routing"""
+    
+    def setUp(self):
+        self.servers = []
+    
+    def tearDown(self):
+        for server in self.servers:
+            server.close()
+    
+    def stub(self, name, **options):
+        server = StubModelServer(name, **options)
+        self.servers.append(server)
+        return server
+    
+    def generate(self, router):
+        response = router.request('POST', '/api/generate', json={'prompt': 'x'}, timeout=5)
+        return response.json()['response']
+    
+    def test_routes_to_least_outstanding(self):
+        """Test that a busy endpoint is passed over for an idle one"""
+        a, b = self.stub('a'), self.stub('b')
+        router = lai_service.ModelRouter([a.url, b.url], hedge_delay=None)
+        router.endpoints[0].outstanding = 5
+        
+        self.assertEqual(self.generate(router), 'idea from b')
+    
+    def test_concurrent_requests_spread_across_endpoints(self):
+        """Test that simultaneous requests are balanced rather than piled onto one endpoint"""
+        from concurrent.futures import ThreadPoolExecutor
+        a, b = self.stub('a', delay=0.2), self.stub('b', delay=0.2)
+        router = lai_service.ModelRouter([a.url, b.url], hedge_delay=None)
+        
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(lambda _: self.generate(router), range(8)))
+        
+        self.assertEqual(a.hits + b.hits, 8)
+        self.assertGreaterEqual(min(a.hits, b.hits), 3)
+        self.assertEqual([e['outstanding'] for e in router.stats()['endpoints']], [0, 0])
+    
+    def test_hedges_slow_endpoint(self):
+        """Test that a duplicate request to a fast endpoint wins over a slow one"""
+        import time
+        slow, fast = self.stub('slow', delay=1.0), self.stub('fast')
+        router = lai_service.ModelRouter([slow.url, fast.url], hedge_delay=0.05)
+        
+        start = time.monotonic()
+        text = self.generate(router)
+        
+        self.assertEqual(text, 'idea from fast')
+        self.assertLess(time.monotonic() - start, 0.8)
+        self.assertEqual(router.stats()['hedged'], 1)
+        self.assertEqual(router.stats()['hedge_wins'], 1)
+    
+    def test_failed_request_retried_elsewhere(self):
+        """Test that an erroring endpoint falls through to a healthy one"""
+        broken, healthy = self.stub('broken', fail=True), self.stub('healthy')
+        router = lai_service.ModelRouter([broken.url, healthy.url], hedge_delay=None)
+        
+        self.assertEqual(self.generate(router), 'idea from healthy')
+    
+    def test_probe_ejects_unhealthy_endpoint(self):
+        """Test that an endpoint failing the status probe stops receiving traffic"""
+        broken, healthy = self.stub('broken', fail=True), self.stub('healthy')
+        router = lai_service.ModelRouter([broken.url, healthy.url], hedge_delay=None)
+        
+        statuses = [endpoint['status'] for endpoint in router.probe()]
+        broken.hits = 0
+        for _ in range(3):
+            self.generate(router)
+        
+        self.assertEqual(statuses, ['disconnected', 'connected'])
+        self.assertEqual(broken.hits, 0)
+    
+    def test_unknown_model_does_not_eject_endpoint(self):
+        """Test that 4xx answers go back to the caller without hurting endpoint health"""
+        healthy = self.stub('llama2')
+        other = self.stub('llama2')
+        router = lai_service.ModelRouter([healthy.url, other.url], hedge_delay=None)
+        
+        for _ in range(lai_service.OLLAMA_EJECT_FAILURES + 1):
+            response = router.request('POST', '/api/generate', json={'model': 'bogus'}, timeout=5)
+            self.assertEqual(response.status_code, 404)
+        
+        # Each 4xx was answered by one endpoint, not retried on the other
+        self.assertEqual(healthy.hits + other.hits, lai_service.OLLAMA_EJECT_FAILURES + 1)
+        self.assertTrue(all(e['available'] for e in router.stats()['endpoints']))
+        self.assertEqual(
+            router.request('POST', '/api/generate', json={'model': 'llama2'}, timeout=5).json()['response'],
+            'idea from llama2'
+        )
+    
+    def test_all_endpoints_down(self):
+        """Test that BackendUnavailable is raised when nothing answers"""
+        broken = self.stub('broken', fail=True)
+        router = lai_service.ModelRouter([broken.url], hedge_delay=None)
+        
+        with self.assertRaises(lai_service.BackendUnavailable):
+            self.generate(router)
+
+
+class TestTracing(unittest.TestCase):
+    """Test cases for W3C trace context propagation and span export"""
+    
+    SAMPLED = '00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01'
+    UNSAMPLED = '00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-00'
+    
+    def setUp(self):
+        import tempfile
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'traces.jsonl')
+        self.exporters = []
+        self.client = app.test_client()
+    
+    def tearDown(self):
+        for exporter in self.exporters:
+            exporter.shutdown()
+        self.tmpdir.cleanup()
+    
+    def tracer(self, sample_rate=0.0, **options):
+        options.setdefault('interval', 60)
+        exporter = lai_service.SpanExporter(self.path, **options)
+        self.exporters.append(exporter)
+        return lai_service.Tracer(exporter, sample_rate)
+    
+    def exported_spans(self, tracer):
+        tracer.exporter.flush()
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path) as f:
+            return [
+                span
+                for line in f
+                for resource in json.loads(line)['resourceSpans']
+                for scope in resource['scopeSpans']
+                for span in scope['spans']
+            ]
+    
+    def test_parse_traceparent(self):
+        """Test that valid headers parse and malformed ones are ignored"""
+        parse = lai_service.parse_traceparent
+        self.assertEqual(
+            parse(self.SAMPLED),
+            ('4bf92f3577b34da6a3ce929d0e0e4736', '00f067aa0ba902b7', True)
+        )
+        self.assertFalse(parse(self.UNSAMPLED)[2])
+        self.assertIsNotNone(parse('01-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01-extra'))
+        for header in (None, '', 'garbage', self.SAMPLED.upper(), self.SAMPLED + '-extra',
+                       'ff' + self.SAMPLED[2:], '00-' + '0' * 32 + '-00f067aa0ba902b7-01',
+                       '00-4bf92f3577b34da6a3ce929d0e0e4736-' + '0' * 16 + '-01'):
+            self.assertIsNone(parse(header), header)
+    
+    def test_sampled_request_exports_stage_spans(self):
+        """Test that a sampled request exports its server span and stage spans"""
+        tracer = self.tracer()
+        with patch.object(lai_service, 'tracer', tracer):
+            response = self.client.post(
+                '/api/validate',
+                data=json.dumps({'businessName': 'Texas Tech', 'businessGoals': 'Software'}),
+                content_type='application/json',
+                headers={'traceparent': self.SAMPLED}
+            )
+        self.assertEqual(response.status_code, 200)
+        
+        spans = {span['name']: span for span in self.exported_spans(tracer)}
+        self.assertEqual(set(spans), {'POST /api/validate', 'parse', 'compute', 'serialize'})
+        root = spans['POST /api/validate']
+        self.assertEqual(root['parentSpanId'], '00f067aa0ba902b7')
+        self.assertEqual(root['kind'], lai_service.Span.KIND_SERVER)
+        self.assertIn({'key': 'http.status_code', 'value': {'intValue': '200'}}, root['attributes'])
+        for name in ('parse', 'compute', 'serialize'):
+            self.assertEqual(spans[name]['traceId'], '4bf92f3577b34da6a3ce929d0e0e4736')
+            self.assertEqual(spans[name]['parentSpanId'], root['spanId'])
+            self.assertLessEqual(int(root['startTimeUnixNano']), int(spans[name]['startTimeUnixNano']))
+    
+    def test_unsampled_requests_not_exported(self):
+        """Test that requests outside the sample are neither queued nor exported"""
+        tracer = self.tracer(sample_rate=0.0)
+        with patch.object(lai_service, 'tracer', tracer):
+            self.client.get('/api/health')
+            self.client.get('/api/health', headers={'traceparent': self.UNSAMPLED})
+        
+        self.assertEqual(self.exported_spans(tracer), [])
+        self.assertEqual(tracer.exporter.stats()['dropped'], 0)
+    
+    def test_sample_rate_starts_new_trace(self):
+        """Test that a sampled request without traceparent becomes a trace root"""
+        tracer = self.tracer(sample_rate=1.0)
+        with patch.object(lai_service, 'tracer', tracer):
+            self.client.get('/api/health')
+        
+        spans = self.exported_spans(tracer)
+        self.assertEqual(len(spans), 1)
+        self.assertNotIn('parentSpanId', spans[0])
+        self.assertEqual(len(spans[0]['traceId']), 32)
+    
+    def test_error_response_marks_span(self):
+        """Test that a failing request's server span carries an error status"""
+        tracer = self.tracer()
+        with patch.object(lai_service, 'tracer', tracer):
+            response = self.client.post(
+                '/api/validate', data='{"broken": ', content_type='application/json',
+                headers={'traceparent': self.SAMPLED}
+            )
+        self.assertEqual(response.status_code, 400)
+        
+        spans = {span['name']: span for span in self.exported_spans(tracer)}
+        self.assertEqual(spans['parse']['status']['code'], 2)
+        self.assertIn('BadRequest', spans['parse']['status']['message'])
+    
+    def test_untraced_error_leaves_noop_span_stateless(self):
+        """Test that an untraced 5xx response does not write onto the shared no-op span"""
+        with patch.object(lai_service, 'tracer', lai_service.Tracer()), \
+                patch.object(lai_service.validator, 'calculate_feasibility', side_effect=RuntimeError('boom')):
+            response = self.client.post(
+                '/api/validate', data=json.dumps({'businessName': 'Test'}), content_type='application/json'
+            )
+        
+        self.assertEqual(response.status_code, 500)
+        self.assertIsNone(lai_service.NOOP_SPAN.error)
+        self.assertFalse(hasattr(lai_service.NOOP_SPAN, '__dict__'))
+    
+    def test_model_call_propagates_traceparent(self):
+        """Test that outbound model requests carry the trace as a child span"""
+        server = StubModelServer('traced')
+        try:
+            router = lai_service.ModelRouter([server.url], hedge_delay=None)
+            tracer = self.tracer()
+            with patch.object(lai_service, 'tracer', tracer):
+                root = tracer.start_request('test', self.SAMPLED)
+                router.request('POST', '/api/generate', json={'prompt': 'x'}, timeout=5)
+                root.end()
+                
+                unsampled = tracer.start_request('test', self.UNSAMPLED)
+                router.request('POST', '/api/generate', json={'prompt': 'x'}, timeout=5)
+                unsampled.end()
+        finally:
+            server.close()
+        
+        # The unsampled request was not recorded, so the caller's context goes out as-is
+        self.assertEqual(server.headers['traceparent'], self.UNSAMPLED)
+        
+        spans = {span['name']: span for span in self.exported_spans(tracer)}
+        self.assertEqual(set(spans), {'test', 'POST /api/generate'})
+        client = spans['POST /api/generate']
+        self.assertEqual(client['kind'], lai_service.Span.KIND_CLIENT)
+        self.assertEqual(client['parentSpanId'], spans['test']['spanId'])
+    
+    def test_untraced_request_forwards_traceparent_unchanged(self):
+        """Test that without an exporter a sampled caller's context reaches the model server intact"""
+        server = StubModelServer('passthrough')
+        try:
+            router = lai_service.ModelRouter([server.url], hedge_delay=None)
+            tracer = lai_service.Tracer()
+            with patch.object(lai_service, 'tracer', tracer):
+                root = tracer.start_request('test', self.SAMPLED, 'vendor=abc')
+                self.assertNotIsInstance(root, lai_service.Span)
+                self.assertIs(tracer.span('compute'), root)
+                router.request('POST', '/api/generate', json={'prompt': 'x'}, timeout=5)
+                root.end()
+            self.assertIsNone(tracer.current())
+        finally:
+            server.close()
+        
+        self.assertEqual(server.headers['traceparent'], self.SAMPLED)
+        self.assertEqual(server.headers['tracestate'], 'vendor=abc')
+    
+    def test_exporter_batches_spans(self):
+        """Test that spans are written as batches of at most batch_size"""
+        tracer = self.tracer(sample_rate=1.0, batch_size=10)
+        for _ in range(25):
+            tracer.start_request('span').end()
+        tracer.exporter.shutdown()
+        
+        with open(self.path) as f:
+            batches = [json.loads(line)['resourceSpans'][0]['scopeSpans'][0]['spans'] for line in f]
+        self.assertEqual(sum(len(batch) for batch in batches), 25)
+        self.assertTrue(all(len(batch) <= 10 for batch in batches))
+        self.assertEqual(tracer.exporter.stats()['exported'], 25)
+    
+    def test_exporter_drops_when_full(self):
+        """Test that a full buffer drops spans instead of blocking"""
+        tracer = self.tracer(sample_rate=1.0, max_queue=5)
+        for _ in range(8):
+            tracer.start_request('span').end()
+        
+        self.assertEqual(tracer.exporter.stats()['dropped'], 3)
+        self.assertEqual(len(self.exported_spans(tracer)), 5)
 
 
 class TestAPIEndpoints(unittest.TestCase):
@@ -171,6 +1051,23 @@ class TestAPIEndpoints(unittest.TestCase):
         self.assertEqual(data['status'], 'healthy')
         self.assertIn('service', data)
         self.assertIn('model', data)
+        self.assertIn('admission', data)
+        self.assertIn('generate', data['admission'])
+    
+    def test_validate_endpoint_sheds_when_saturated(self):
+        """Test that a saturated endpoint rejects with 503 but health still answers"""
+        controller = lai_service.admission['validate']
+        with patch.object(controller, 'acquire', return_value=False):
+            response = self.client.post(
+                '/api/validate',
+                data=json.dumps({}),
+                content_type='application/json'
+            )
+            health = self.client.get('/api/health')
+        
+        self.assertEqual(response.status_code, 503)
+        self.assertIn('Retry-After', response.headers)
+        self.assertEqual(health.status_code, 200)
     
     def test_generate_endpoint(self):
         """Test idea generation endpoint"""
@@ -241,6 +1138,61 @@ class TestAPIEndpoints(unittest.TestCase):
         self.assertGreaterEqual(data['feasibility_score'], 0)
         self.assertLessEqual(data['feasibility_score'], 100)
     
+    def test_generate_endpoint_flags_session_duplicates(self):
+        """Test that repeated enhancements in one session are flagged"""
+        payload = {
+            'prompt': 'enhance "Tech Startup in Austin"',
+            'session_id': 'test-session-duplicates'
+        }
+        
+        flags = []
+        for _ in range(2):
+            response = self.client.post(
+                '/api/generate',
+                data=json.dumps(payload),
+                content_type='application/json'
+            )
+            self.assertEqual(response.status_code, 200)
+            flags.append(json.loads(response.data)['near_duplicate'])
+        
+        self.assertEqual(flags, [False, True])
+    
+    def test_generate_endpoint_with_model(self):
+        """Test that requests naming a model are forwarded to a model server"""
+        server = StubModelServer('llama2')
+        try:
+            router = lai_service.ModelRouter([server.url], hedge_delay=None)
+            with patch.object(lai_service, 'model_router', router):
+                response = self.client.post(
+                    '/api/generate',
+                    data=json.dumps({'prompt': 'Generate a business idea', 'model': 'llama2'}),
+                    content_type='application/json'
+                )
+        finally:
+            server.close()
+        
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.data)
+        self.assertEqual(data['text'], 'idea from llama2')
+        self.assertEqual(data['model'], 'llama2')
+    
+    def test_generate_endpoint_unknown_model(self):
+        """Test that a model server's 404 is passed through rather than reported as 502"""
+        server = StubModelServer('llama2')
+        try:
+            router = lai_service.ModelRouter([server.url], hedge_delay=None)
+            with patch.object(lai_service, 'model_router', router):
+                response = self.client.post(
+                    '/api/generate',
+                    data=json.dumps({'prompt': 'Generate a business idea', 'model': 'bogus'}),
+                    content_type='application/json'
+                )
+        finally:
+            server.close()
+        
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(json.loads(response.data)['error'], "model 'bogus' not found")
+    
     def test_generate_endpoint_error_handling(self):
         """Test error handling in generate endpoint"""
         response = self.client.post(
@@ -252,6 +1204,51 @@ class TestAPIEndpoints(unittest.TestCase):
         # Should either return 400 or 500 depending on error handling
         self.assertIn(response.status_code, [400, 500])
     
+    @patch.object(lai_service, 'VALIDATE_BATCHING', True)
+    def test_validate_endpoint_batched(self):
+        """Test validation endpoint with micro-batching enabled"""
+        response = self.client.post(
+            '/api/validate',
+            data=json.dumps({'businessName': 'Test', 'estimatedBudget': '$50,000'}),
+            content_type='application/json'
+        )
+        
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.data)
+        self.assertEqual(data['feasibility_score'], 28)
+    
+    def test_generate_top_endpoint(self):
+        """Test the generate-and-rank endpoint"""
+        payload = {
+            'category': 'self-employment',
+            'k': 3,
+            'max_candidates': 200,
+            'profile': {'businessName': 'Test', 'estimatedBudget': '$10,000'}
+        }
+        
+        response = self.client.post(
+            '/api/generate/top',
+            data=json.dumps(payload),
+            content_type='application/json'
+        )
+        
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.data)
+        self.assertEqual(len(data['ideas']), 3)
+        self.assertLessEqual(data['explored'], 200)
+        self.assertIn('score', data['ideas'][0])
+    
+    def test_generate_top_endpoint_invalid_params(self):
+        """Test that a bad body, category, k or profile is rejected with 400"""
+        for payload in ({'category': 'unknown'}, {'k': 0}, {'k': 'five'}, {'max_candidates': -1},
+                        [], 'ideas', None, {'profile': []}, {'profile': {'accommodationNeeds': 5}}):
+            response = self.client.post(
+                '/api/generate/top',
+                data=json.dumps(payload),
+                content_type='application/json'
+            )
+            self.assertEqual(response.status_code, 400, payload)
+    
     def test_validate_endpoint_empty_data(self):
         """Test validation endpoint with empty data"""
         payload = {}
@@ -268,7 +1265,197 @@ class TestAPIEndpoints(unittest.TestCase):
         self.assertIn('feasibility_score', data)
         self.assertEqual(data['feasibility_score'], 0)
     
-    @patch('requests.get')
+    def test_validate_endpoint_payload_too_large(self):
+        """Test that bodies over the size limit are rejected with 413"""
+        payload = {'businessGoals': 'x' * (lai_service.MAX_REQUEST_BYTES + 1)}
+        
+        response = self.client.post(
+            '/api/validate',
+            data=json.dumps(payload),
+            content_type='application/json'
+        )
+        
+        self.assertEqual(response.status_code, 413)
+        self.assertIn('error', json.loads(response.data))
+    
+    def test_non_json_content_type_rejected(self):
+        """Test that non-JSON bodies get 415 like request.get_json() gave"""
+        for path in ('/api/validate', '/api/generate', '/api/jobs'):
+            response = self.client.post(path, data='{"businessName": "Test"}', content_type='text/plain')
+            self.assertEqual(response.status_code, 415, path)
+            self.assertIn('error', json.loads(response.data))
+    
+    def test_validate_endpoint_invalid_json(self):
+        """Test that malformed JSON is rejected with 400"""
+        response = self.client.post(
+            '/api/validate',
+            data='{"businessName": ',
+            content_type='application/json'
+        )
+        
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('error', json.loads(response.data))
+    
+    def test_scoring_rules_endpoint(self):
+        """Test that the scoring spec is served with an ETag"""
+        response = self.client.get('/api/scoring-rules')
+        self.assertEqual(response.status_code, 200)
+        
+        data = json.loads(response.data)
+        self.assertEqual(data, lai_service.SCORING_RULES)
+        self.assertIn('ETag', response.headers)
+        self.assertIn('max-age', response.headers['Cache-Control'])
+    
+    def test_scoring_rules_conditional_get(self):
+        """Test that a matching If-None-Match returns 304 without a body"""
+        etag = self.client.get('/api/scoring-rules').headers['ETag']
+        
+        response = self.client.get(
+            '/api/scoring-rules', headers={'If-None-Match': etag, 'Accept-Encoding': 'gzip'}
+        )
+        
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.data, b'')
+        # Caches must see the same Vary as on the full response
+        self.assertIn('Accept-Encoding', response.vary)
+        self.assertNotIn('Content-Encoding', response.headers)
+    
+    def test_job_endpoints(self):
+        """Test submit, poll, page, stream and cancel through the jobs API"""
+        import gzip
+        import tempfile
+        import time
+        
+        with tempfile.TemporaryDirectory() as tmpdir:
+            queue = lai_service.JobQueue(
+                os.path.join(tmpdir, 'jobs.db'), IdeaGenerator(), ValidationEngine(),
+                workers=1, poll_interval=0.01
+            )
+            try:
+                with patch.object(lai_service, '_job_queue', queue):
+                    response = self.client.post(
+                        '/api/jobs',
+                        data=json.dumps({'kind': 'generate', 'params': {'category': 'contracts', 'count': 12}}),
+                        content_type='application/json'
+                    )
+                    self.assertEqual(response.status_code, 202)
+                    job_id = json.loads(response.data)['id']
+                    self.assertEqual(response.headers['Location'], f'/api/jobs/{job_id}')
+                    
+                    deadline = time.time() + 10
+                    while json.loads(self.client.get(f'/api/jobs/{job_id}').data)['status'] != 'completed':
+                        self.assertLess(time.time(), deadline)
+                        time.sleep(0.01)
+                    
+                    page = json.loads(self.client.get(f'/api/jobs/{job_id}/results?offset=0&limit=10').data)
+                    self.assertEqual(len(page['results']), 10)
+                    self.assertEqual(page['next_offset'], 10)
+                    
+                    stream = self.client.get(
+                        f'/api/jobs/{job_id}/results?format=ndjson&offset=2',
+                        headers={'Accept-Encoding': 'gzip'}
+                    )
+                    self.assertEqual(stream.mimetype, 'application/x-ndjson')
+                    self.assertEqual(stream.headers['Content-Encoding'], 'gzip')
+                    lines = gzip.decompress(stream.data).decode().splitlines()
+                    self.assertEqual(len(lines), 10)
+                    self.assertIn('text', json.loads(lines[0]))
+                    
+                    self.assertEqual(self.client.delete(f'/api/jobs/{job_id}').status_code, 409)
+                    self.assertEqual(self.client.get('/api/jobs/missing').status_code, 404)
+                    bad = self.client.post(
+                        '/api/jobs',
+                        data=json.dumps({'kind': 'unknown'}),
+                        content_type='application/json'
+                    )
+                    self.assertEqual(bad.status_code, 400)
+                    for body in ('[1, 2]', '"generate"'):
+                        response = self.client.post('/api/jobs', data=body, content_type='application/json')
+                        self.assertEqual(response.status_code, 400)
+            finally:
+                queue.stop(timeout=5)
+    
+    def test_large_response_gzip_compressed(self):
+        """Test that a large JSON response is gzipped when the client accepts it"""
+        import gzip
+        payload = json.dumps({'category': 'contracts', 'k': 20, 'max_candidates': 200})
+        plain = self.client.post('/api/generate/top', data=payload, content_type='application/json')
+        response = self.client.post(
+            '/api/generate/top', data=payload, content_type='application/json',
+            headers={'Accept-Encoding': 'gzip'}
+        )
+        
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response.headers['Vary'])
+        self.assertLess(len(response.data), len(plain.data))
+        self.assertTrue(json.loads(gzip.decompress(response.data))['ideas'])
+    
+    def test_small_or_unaccepted_response_not_compressed(self):
+        """Test that small bodies and clients without Accept-Encoding get identity"""
+        small = self.client.get('/api/health', headers={'Accept-Encoding': 'gzip'})
+        self.assertNotIn('Content-Encoding', small.headers)
+        
+        payload = json.dumps({'category': 'contracts', 'k': 20, 'max_candidates': 200})
+        response = self.client.post('/api/generate/top', data=payload, content_type='application/json')
+        self.assertNotIn('Content-Encoding', response.headers)
+        self.assertIn('Accept-Encoding', response.headers['Vary'])
+    
+    def test_compressed_response_etag_is_weak(self):
+        """Test that compressing a response downgrades its strong ETag"""
+        with patch.object(lai_service, 'COMPRESS_MIN_BYTES', 0):
+            response = self.client.get('/api/scoring-rules', headers={'Accept-Encoding': 'deflate'})
+        
+        self.assertEqual(response.headers['Content-Encoding'], 'deflate')
+        self.assertTrue(response.headers['ETag'].startswith('W/'))
+        import zlib
+        self.assertEqual(json.loads(zlib.decompress(response.data)), lai_service.SCORING_RULES)
+    
+    def test_compressor_stream_roundtrip(self):
+        """Test that every available encoding round-trips a flushed stream"""
+        import zlib
+        decoders = {
+            'gzip': lambda data: zlib.decompress(data, 16 + zlib.MAX_WBITS),
+            'deflate': zlib.decompress,
+        }
+        if lai_service.brotli is not None:
+            decoders['br'] = lai_service.brotli.decompress
+        if lai_service.zstandard is not None:
+            decoders['zstd'] = lambda data: lai_service.zstandard.ZstdDecompressor().decompressobj().decompress(data)
+        
+        chunks = [json.dumps({'n': i}).encode() + b'\n' for i in range(50)]
+        for encoding in lai_service.available_encodings():
+            with self.subTest(encoding=encoding):
+                compressed = b''.join(lai_service.compress_stream(iter(chunks), lai_service.Compressor(encoding)))
+                self.assertEqual(decoders[encoding](compressed), b''.join(chunks))
+    
+    def test_cancelled_job_results_paging_ends(self):
+        """Test that paging a cancelled job's results terminates"""
+        import tempfile
+        
+        with tempfile.TemporaryDirectory() as tmpdir:
+            queue = lai_service.JobQueue(
+                os.path.join(tmpdir, 'jobs.db'), IdeaGenerator(), ValidationEngine(), workers=0
+            )
+            try:
+                with patch.object(lai_service, '_job_queue', queue):
+                    job = queue.submit('generate', {'category': 'jobs', 'count': 50})
+                    self.assertEqual(self.client.delete(f"/api/jobs/{job['id']}").status_code, 200)
+                    
+                    offset, pages = 0, 0
+                    while offset is not None:
+                        pages += 1
+                        self.assertLess(pages, 5)
+                        page = json.loads(self.client.get(
+                            f"/api/jobs/{job['id']}/results?offset={offset}&limit=10"
+                        ).data)
+                        offset = page['next_offset']
+                    
+                    self.assertEqual(page['results'], [])
+                    self.assertEqual(page['job']['status'], 'cancelled')
+            finally:
+                queue.stop(timeout=5)
+    
+    @patch('requests.Session.get')
     def test_ollama_status_connected(self, mock_get):
         """Test Ollama status endpoint when connected"""
         mock_response = MagicMock()
@@ -288,7 +1475,7 @@ class TestAPIEndpoints(unittest.TestCase):
         self.assertEqual(data['status'], 'connected')
         self.assertIn('available_models', data)
     
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_ollama_status_disconnected(self, mock_get):
         """Test Ollama status endpoint when disconnected"""
         mock_get.side_effect = Exception('Connection refused')
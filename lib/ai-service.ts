@@ -21,6 +21,19 @@ export interface AIServiceConfig {
   endpoint?: string
   model?: string
   apiKey?: string
+  // Fraction of local service requests whose W3C trace is marked sampled (0-1)
+  traceSampleRate?: number
+}
+
+function randomHex(bytes: number): string {
+  const values = new Uint8Array(bytes)
+  globalThis.crypto.getRandomValues(values)
+  return Array.from(values, (value) => value.toString(16).padStart(2, "0")).join("")
+}
+
+// Build a W3C traceparent header starting a new trace for one request
+export function createTraceparent(sampled: boolean): string {
+  return `00-${randomHex(16)}-${randomHex(8)}-${sampled ? "01" : "00"}`
 }
 
 class AIService {
@@ -85,12 +98,14 @@ class AIService {
   private async generateWithLocal(request: AIRequest, startTime: number): Promise<AIResponse> {
     // This would integrate with a local Python AI service
     const endpoint = this.config.endpoint || "http://localhost:5000"
+    const sampled = Math.random() < (this.config.traceSampleRate ?? 0)
 
     try {
       const response = await fetch(`${endpoint}/api/generate`, {
         method: "POST",
         headers: {
           "Content-Type": "application/json",
+          traceparent: createTraceparent(sampled),
         },
         body: JSON.stringify({
           prompt: request.prompt,
@@ -215,6 +230,7 @@ export function getAIService(config?: AIServiceConfig): AIService {
       provider: "mock", // Default to mock, can be configured via environment
       endpoint: process.env.NEXT_PUBLIC_AI_ENDPOINT,
       model: process.env.NEXT_PUBLIC_AI_MODEL,
+      traceSampleRate: Number(process.env.NEXT_PUBLIC_TRACE_SAMPLE_RATE ?? 0),
     }
 
     aiServiceInstance = new AIService(config || defaultConfig)
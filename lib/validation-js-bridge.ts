@@ -1,9 +1,12 @@
 /**
  * JavaScript implementation of validation algorithms
  * This provides browser-compatible versions of Python validation logic
- * Ensures feature parity for client-side processing
+ * Scoring follows the rule spec served at /api/scoring-rules, so clients
+ * stay in step with the service without re-implementing its weights
  */
 
+import defaultScoringRules from './scoring-rules.json';
+
 export interface ValidationData {
   businessName?: string;
   businessType?: string;
@@ -21,69 +24,139 @@ export interface FeasibilityResult {
   recommendation: string;
 }
 
+export interface ScoringRules {
+  version: number;
+  max_score: number;
+  completeness: { weight: number; label: string; fields: string[] };
+  detail: {
+    weight: number;
+    label: string;
+    thresholds: Array<{ field: string; longer_than: number; points: number }>;
+  };
+  budget: { weight: number; field: string; met_label: string; unmet_label: string };
+  market: { weight: number; label: string; fields: string[]; keywords: string[] };
+  readiness: Array<{ field: string; points: number }>;
+  recommendations: Array<{ min_score: number; label: string }>;
+  default_recommendation: string;
+}
+
+/**
+ * Built-in copy of the spec served by GET /api/scoring-rules
+ * Used until a fresh spec has been fetched from the service; the Python
+ * tests check that scoring-rules.json matches the service's SCORING_RULES
+ */
+export const DEFAULT_SCORING_RULES: ScoringRules = defaultScoringRules;
+
+export interface ScoringRulesResponse {
+  rules: ScoringRules;
+  etag: string | null;
+}
+
+/**
+ * Fetch the scoring spec, revalidating with If-None-Match when a cached copy exists
+ * Returns the cached copy unchanged on 304 Not Modified
+ */
+export async function fetchScoringRules(
+  endpoint: string,
+  cached?: ScoringRulesResponse
+): Promise<ScoringRulesResponse> {
+  const headers: Record<string, string> = {};
+  if (cached?.etag) {
+    headers['If-None-Match'] = cached.etag;
+  }
+
+  const response = await fetch(`${endpoint}/api/scoring-rules`, { headers });
+  if (response.status === 304 && cached) {
+    return cached;
+  }
+  if (!response.ok) {
+    throw new Error(`Failed to fetch scoring rules: ${response.status}`);
+  }
+
+  return {
+    rules: (await response.json()) as ScoringRules,
+    etag: response.headers.get('ETag')
+  };
+}
+
+/**
+ * Round half to even, matching Python's round()
+ */
+export function roundHalfEven(value: number): number {
+  const floor = Math.floor(value);
+  const diff = value - floor;
+  if (diff > 0.5) {
+    return floor + 1;
+  }
+  if (diff < 0.5) {
+    return floor;
+  }
+  return floor % 2 === 0 ? floor : floor + 1;
+}
+
 export class ValidationEngine {
+  constructor(private rules: ScoringRules = DEFAULT_SCORING_RULES) {}
+
+  get version(): number {
+    return this.rules.version;
+  }
+
   /**
    * Calculate feasibility score using multiple factors
-   * This mirrors the Python implementation for consistency
+   * Driven by the same rule spec as the Python implementation
    */
   calculateFeasibility(data: ValidationData): FeasibilityResult {
+    const rules = this.rules;
+    const fields = data as Record<string, string | undefined>;
     let score = 0;
     const factors: string[] = [];
 
-    // Completeness factor (30%)
-    const requiredFields = ['businessName', 'businessType', 'businessGoals', 'accommodationNeeds'];
-    const completeness = requiredFields.filter(field => data[field as keyof ValidationData]).length / requiredFields.length;
-    score += completeness * 30;
-    factors.push(`Completeness: ${Math.round(completeness * 100)}%`);
+    // Completeness factor
+    const requiredFields = rules.completeness.fields;
+    const completeness = requiredFields.filter(field => fields[field]).length / requiredFields.length;
+    score += completeness * rules.completeness.weight;
+    factors.push(`${rules.completeness.label}: ${roundHalfEven(completeness * 100)}%`);
 
-    // Detail factor (25%)
+    // Detail factor
     let detailScore = 0;
-    if ((data.accommodationNeeds?.length || 0) > 100) {
-      detailScore += 0.4;
-    }
-    if ((data.businessGoals?.length || 0) > 100) {
-      detailScore += 0.4;
+    for (const threshold of rules.detail.thresholds) {
+      if ((fields[threshold.field]?.length || 0) > threshold.longer_than) {
+        detailScore += threshold.points;
+      }
     }
-    if ((data.targetMarket?.length || 0) > 50) {
-      detailScore += 0.2;
-    }
-    score += detailScore * 25;
-    factors.push(`Detail Level: ${Math.round(detailScore * 100)}%`);
+    score += detailScore * rules.detail.weight;
+    factors.push(`${rules.detail.label}: ${roundHalfEven(detailScore * 100)}%`);
 
-    // Budget factor (20%)
-    const budgetStr = data.estimatedBudget || '';
+    // Budget factor
+    const budgetStr = fields[rules.budget.field] || '';
     if (/\d/.test(budgetStr)) {
-      score += 20;
-      factors.push('Budget: Well-defined');
+      score += rules.budget.weight;
+      factors.push(rules.budget.met_label);
     } else {
-      factors.push('Budget: Needs specification');
+      factors.push(rules.budget.unmet_label);
     }
 
-    // Market alignment (15%)
-    const marketKeywords = ['texas', 'local', 'community', 'market', 'customer'];
-    const marketText = `${data.targetMarket || ''} ${data.businessGoals || ''}`.toLowerCase();
-    const marketMatches = marketKeywords.filter(kw => marketText.includes(kw)).length;
+    // Market alignment
+    const marketKeywords = rules.market.keywords;
+    const marketTexts = rules.market.fields.map(field => (fields[field] || '').toLowerCase());
+    const marketMatches = marketKeywords.filter(kw => marketTexts.some(text => text.includes(kw))).length;
     const marketScore = Math.min(marketMatches / marketKeywords.length, 1.0);
-    score += marketScore * 15;
-    factors.push(`Market Alignment: ${Math.round(marketScore * 100)}%`);
+    score += marketScore * rules.market.weight;
+    factors.push(`${rules.market.label}: ${roundHalfEven(marketScore * 100)}%`);
 
-    // Implementation readiness (10%)
-    if (data.timeline) {
-      score += 5;
-    }
-    if (data.expectedOutcomes) {
-      score += 5;
+    // Implementation readiness
+    for (const item of rules.readiness) {
+      if (fields[item.field]) {
+        score += item.points;
+      }
     }
 
-    const finalScore = Math.round(Math.min(score, 100));
-    const recommendation = finalScore >= 80 
-      ? 'High feasibility' 
-      : finalScore >= 60 
-      ? 'Moderate feasibility' 
-      : 'Needs refinement';
+    // Recommendation thresholds compare against the unrounded score
+    const recommendation = rules.recommendations.find(r => score >= r.min_score)?.label
+      ?? rules.default_recommendation;
 
     return {
-      score: finalScore,
+      score: roundHalfEven(Math.min(score, rules.max_score)),
       factors,
       recommendation
     };